@@ -0,0 +1,144 @@
+"""Benchmark bulk cancel of ExecuteContext against a local stub broker.
+
+The stub broker is an HTTP server on localhost that serves get orders and
+cancel orders of the Settrade Open API. Each request sleeps BASE_LATENCY plus
+PER_ORDER_LATENCY for every order in the request, so the result includes the
+whole path of the Settrade SDK (requests, JSON, response parsing).
+
+Run
+---
+python -m benchmarks.bench_cancel_orders
+"""
+import json
+import time
+from dataclasses import fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from typing import Callable
+
+from settrade_v2.context import Context
+from settrade_v2.user import Investor
+
+from ezyquant_execution.context import ExecuteContext
+from ezyquant_execution.entity import EquityOrder
+
+N_ORDER = 300
+BASE_LATENCY = 0.02
+PER_ORDER_LATENCY = 0.001
+
+BROKER_ID = "000"
+ACCOUNT_NO = "0000000"
+
+
+def _camel(name: str) -> str:
+    first, *rest = name.split("_")
+    return first + "".join(i.capitalize() for i in rest)
+
+
+ORDERS = [
+    {
+        **{_camel(i.name): None for i in fields(EquityOrder)},
+        "orderNo": str(i),
+        "symbol": "AOT",
+        "canCancel": True,
+    }
+    for i in range(N_ORDER)
+]
+
+
+class StubBrokerHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self._read()
+        time.sleep(BASE_LATENCY)
+        self._send(ORDERS)
+
+    def do_PATCH(self):
+        body = self._read()
+        time.sleep(BASE_LATENCY + PER_ORDER_LATENCY * len(body["orders"]))
+        self._send(
+            {
+                "results": [
+                    {
+                        "orderNo": i,
+                        "errorResponse": None,
+                        "httpStatus": "OK",
+                        "httpStatusCode": 200,
+                    }
+                    for i in body["orders"]
+                ]
+            }
+        )
+
+    def _read(self):
+        # Read the whole body, otherwise the connection is reset on close
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length)) if length else None
+
+    def _send(self, data):
+        content = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubBrokerServer(ThreadingHTTPServer):
+    # Default backlog of 5 drops concurrent connections of parallel cancel
+    request_queue_size = 128
+
+
+def stub_investor(base_url: str) -> Investor:
+    ctx = Context.__new__(Context)
+    ctx.__dict__.update(
+        app_id="",
+        broker_id=BROKER_ID,
+        base_url=base_url,
+        token_type="Bearer",
+        token="",
+        is_auto_queue=False,
+        rate_limit={},
+        expired_at=int(time.time()) + 3600,
+        refresh_token_before_exp=100,
+    )
+    user = Investor.__new__(Investor)
+    user._ctx = ctx
+    return user
+
+
+def bench(name: str, function: Callable[[ExecuteContext], list], ctx: ExecuteContext):
+    start = time.perf_counter()
+    result = function(ctx)
+    elapsed = time.perf_counter() - start
+    assert len(result) == N_ORDER
+    print(f"{name:<26} {elapsed * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    server = StubBrokerServer(("127.0.0.1", 0), StubBrokerHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    ctx = ExecuteContext(
+        settrade_user=stub_investor(f"http://127.0.0.1:{server.server_port}"),
+        account_no=ACCOUNT_NO,
+        pin="000000",
+    )
+
+    print(f"{N_ORDER} orders")
+    bench(
+        "one request",
+        lambda x: x.cancel_orders(chunk_size=N_ORDER, max_workers=1),
+        ctx,
+    )
+    bench(
+        "chunked sequential",
+        lambda x: x.cancel_orders(max_workers=1),
+        ctx,
+    )
+    bench("chunked parallel", lambda x: x.cancel_orders(), ctx)
+    bench("cancel_all_orders", lambda x: x.cancel_all_orders(), ctx)
+
+    server.shutdown()
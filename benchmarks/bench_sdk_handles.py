@@ -0,0 +1,87 @@
+"""Benchmark per-call overhead of Settrade SDK handles in ExecuteContext.
+
+Compare place_order and get_orders of ExecuteContext with a context that
+builds SDK handles and keyword arguments on every access. The SDK requests are
+replaced by stubs, so the result is only the overhead of ezyquant-execution.
+
+Run
+---
+python -m benchmarks.bench_sdk_handles
+"""
+import timeit
+from dataclasses import fields
+from types import SimpleNamespace
+from typing import Union
+
+from settrade_v2.equity import InvestorEquity, MarketRepEquity
+from settrade_v2.user import Investor, MarketRep
+
+from ezyquant_execution.context import ExecuteContext
+from ezyquant_execution.entity import EquityOrder
+
+N = 10000
+N_HANDLE = 100000
+
+ORDER = {i.name: None for i in fields(EquityOrder)}
+
+
+class UncachedExecuteContext(ExecuteContext):
+    """ExecuteContext that build SDK handles on every access."""
+
+    @property
+    def _acc_no_kw(self) -> dict:
+        return (
+            {"account_no": self.account_no}
+            if isinstance(self.settrade_user, MarketRep)
+            else {}
+        )
+
+    @property
+    def _pin_acc_no_kw(self) -> dict:
+        return (
+            {"account_no": self.account_no}
+            if isinstance(self.settrade_user, MarketRep)
+            else {"pin": self.pin}
+        )
+
+    @property
+    def _settrade_equity(self) -> Union[InvestorEquity, MarketRepEquity]:
+        kw = (
+            {"account_no": self.account_no}
+            if isinstance(self.settrade_user, Investor)
+            else {}
+        )
+        return self.settrade_user.Equity(**kw)
+
+
+def stub_investor() -> Investor:
+    user = Investor.__new__(Investor)
+    user._ctx = SimpleNamespace(base_url="http://localhost", broker_id="000")
+    return user
+
+
+def bench(ctx_class, name: str):
+    ctx = ctx_class(settrade_user=stub_investor(), account_no="0000000", pin="000000")
+
+    InvestorEquity.place_order = lambda self, **kw: ORDER
+    InvestorEquity.get_orders = lambda self: [ORDER]
+
+    place_order = timeit.timeit(
+        lambda: ctx.place_order(symbol="AOT", side="Buy", volume=100, price=60.0),
+        number=N,
+    )
+    get_orders = timeit.timeit(ctx.get_orders, number=N)
+    handle = timeit.timeit(
+        lambda: (ctx._settrade_equity, ctx._pin_acc_no_kw), number=N_HANDLE
+    )
+
+    print(
+        f"{name:<10} handle {handle / N_HANDLE * 1e6:8.3f} us/call"
+        f"  place_order {place_order / N * 1e6:8.1f} us/call"
+        f"  get_orders {get_orders / N * 1e6:8.1f} us/call"
+    )
+
+
+if __name__ == "__main__":
+    bench(UncachedExecuteContext, "uncached")
+    bench(ExecuteContext, "cached")
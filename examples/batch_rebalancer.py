@@ -0,0 +1,27 @@
+from settrade_v2.user import Investor
+
+from ezyquant_execution.context import ExecuteContext
+
+settrade_user = Investor(
+    app_id="CfVAuVWUwcP1grkG",
+    app_secret="AOGH4Zavk0basf6tliHvf1kJuzECnpyoRRiMGpcVEX3O",
+    app_code="ALGO_EQ",
+    broker_id="025",
+)
+account_no = "8300116"
+pin = "111111"
+
+weights = {
+    "AOT": 0.2,
+    "BBL": 0.2,
+    "CPALL": 0.2,
+    "DTAC": 0.2,
+    "EA": 0.2,
+}
+
+ctx = ExecuteContext(settrade_user=settrade_user, account_no=account_no, pin=pin)
+
+ctx.cancel_orders()
+orders = ctx.target_pct_port_many(weights)
+
+print(orders)
@@ -1,3 +1,10 @@
 from ._version import __version__
 from .environment import set_settrade_environment
-from .executing import execute_on_timer
+from .executing import (
+    execute_on_symbol_timer,
+    execute_on_tick,
+    execute_on_timer,
+    execute_on_timer_accounts,
+    execute_on_timer_sharded,
+    warm_up_subscriptions,
+)
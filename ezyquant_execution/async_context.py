@@ -0,0 +1,283 @@
+import asyncio
+from concurrent.futures import Executor
+from datetime import datetime
+from functools import lru_cache, partial
+from typing import Any, Callable, Optional, Union
+
+from settrade_v2.user import Investor, MarketRep
+
+from .cache import AccountSnapshot, ResponseCache
+from .context import ExecuteContext, ExecuteContextSymbol
+
+
+class _AsyncContext:
+    def __init__(self, sync: Any, executor: Optional[Executor] = None):
+        """Run functions of sync context in executor.
+
+        Parameters
+        ----------
+        sync : Any
+            sync context
+        executor : Optional[Executor], optional
+            executor to run Settrade SDK functions. If None, use default
+            executor of the event loop.
+        """
+        self.sync = sync
+        self.executor = executor
+
+    def __eq__(self, other):
+        return type(self) == type(other) and self.sync == other.sync
+
+    def __hash__(self):
+        return id(self)
+
+    def __getattr__(self, name: str):
+        # Attribute of sync context such as account_no, symbol and signal
+        if name in {"sync", "executor"}:
+            raise AttributeError(name)
+        return getattr(self.sync, name)
+
+    @property
+    def ts(self) -> datetime:
+        """Current timestamp."""
+        return self.sync.ts
+
+    async def _run(self, function: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, partial(function, *args, **kwargs)
+        )
+
+
+def _async_property(cls: type, name: str):
+    """Create coroutine function that return property name of sync
+    context."""
+
+    async def function(self: _AsyncContext):
+        return await self._run(getattr, self.sync, name)
+
+    function.__name__ = name
+    function.__doc__ = getattr(cls, name).__doc__
+    return function
+
+
+def _async_method(cls: type, name: str):
+    """Create coroutine function that call method name of sync context."""
+
+    async def function(self: _AsyncContext, *args, **kwargs):
+        return await self._run(getattr(self.sync, name), *args, **kwargs)
+
+    function.__name__ = name
+    function.__doc__ = getattr(cls, name).__doc__
+    return function
+
+
+class AsyncExecuteContext(_AsyncContext):
+    def __init__(
+        self,
+        settrade_user: Union[Investor, MarketRep],
+        account_no: str,
+        pin: Optional[str] = None,
+        snapshot: Optional[AccountSnapshot] = None,
+        cache: Optional[ResponseCache] = None,
+        executor: Optional[Executor] = None,
+    ):
+        """Async execute context.
+
+        Same as ExecuteContext but properties and methods are coroutine
+        functions that run Settrade SDK in executor. For example, use
+        `await ctx.port_value()` instead of `ctx.port_value`.
+
+        Parameters
+        ----------
+        settrade_user : Union[Investor, MarketRep]
+            Settrade user
+        account_no : str
+            Account number
+        pin : Optional[str], optional
+            PIN. Only for investor.
+        snapshot : Optional[AccountSnapshot], optional
+            Account snapshot shared with other contexts.
+        cache : Optional[ResponseCache], optional
+            Cache of account info, portfolios, orders and trades.
+        executor : Optional[Executor], optional
+            executor to run Settrade SDK functions. If None, use default
+            executor of the event loop.
+        """
+        super().__init__(
+            sync=ExecuteContext(
+                settrade_user=settrade_user,
+                account_no=account_no,
+                pin=pin,
+                snapshot=snapshot,
+                cache=cache,
+            ),
+            executor=executor,
+        )
+
+    @lru_cache
+    def Symbol(self, symbol: str) -> "AsyncExecuteContextSymbol":
+        return AsyncExecuteContextSymbol._from_sync(
+            self.sync.Symbol(symbol), executor=self.executor
+        )
+
+    """
+    Account functions
+    """
+
+    line_available = _async_property(ExecuteContext, "line_available")
+    cash_balance = _async_property(ExecuteContext, "cash_balance")
+    total_cost_value = _async_property(ExecuteContext, "total_cost_value")
+    total_market_value = _async_property(ExecuteContext, "total_market_value")
+    pending_order_value = _async_property(ExecuteContext, "pending_order_value")
+    port_value = _async_property(ExecuteContext, "port_value")
+    cash = _async_property(ExecuteContext, "cash")
+
+    """
+    Place order functions
+    """
+
+    target_pct_port_many = _async_method(ExecuteContext, "target_pct_port_many")
+
+    """
+    Cancel order functions
+    """
+
+    cancel_orders = _async_method(ExecuteContext, "cancel_orders")
+    cancel_buy_orders = _async_method(ExecuteContext, "cancel_buy_orders")
+    cancel_sell_orders = _async_method(ExecuteContext, "cancel_sell_orders")
+    cancel_price_orders = _async_method(ExecuteContext, "cancel_price_orders")
+    cancel_all_orders = _async_method(ExecuteContext, "cancel_all_orders")
+
+    """
+    Settrade SDK functions
+    """
+
+    get_account_info = _async_method(ExecuteContext, "get_account_info")
+    get_portfolios = _async_method(ExecuteContext, "get_portfolios")
+    get_orders = _async_method(ExecuteContext, "get_orders")
+    get_trades = _async_method(ExecuteContext, "get_trades")
+    get_portfolio = _async_method(ExecuteContext, "get_portfolio")
+    place_order = _async_method(ExecuteContext, "place_order")
+    get_quote_symbol = _async_method(ExecuteContext, "get_quote_symbol")
+
+    async def prefetch(self, *args, **kwargs):
+        """Same as ExecuteContext.prefetch but for asyncio."""
+        kwargs.setdefault("executor", self.executor)
+        await self.sync.async_prefetch(*args, **kwargs)
+
+
+class AsyncExecuteContextSymbol(AsyncExecuteContext):
+    def __init__(
+        self,
+        settrade_user: Union[Investor, MarketRep],
+        account_no: str,
+        symbol: str,
+        pin: Optional[str] = None,
+        signal: Any = None,
+        snapshot: Optional[AccountSnapshot] = None,
+        cache: Optional[ResponseCache] = None,
+        executor: Optional[Executor] = None,
+    ):
+        """Async execute context of symbol.
+
+        Same as ExecuteContextSymbol but properties and methods are
+        coroutine functions that run Settrade SDK in executor. For
+        example, use `await ctx.best_bid_price()` instead of
+        `ctx.best_bid_price`.
+
+        Parameters
+        ----------
+        settrade_user : Union[Investor, MarketRep]
+            Settrade user
+        account_no : str
+            Account number
+        symbol : str
+            Selected symbol
+        pin : Optional[str], optional
+            PIN. Only for investor.
+        signal : Any, optional
+            Signal, by default None
+        snapshot : Optional[AccountSnapshot], optional
+            Account snapshot shared with other contexts.
+        cache : Optional[ResponseCache], optional
+            Cache of account info, portfolios, orders and trades.
+        executor : Optional[Executor], optional
+            executor to run Settrade SDK functions. If None, use default
+            executor of the event loop.
+        """
+        _AsyncContext.__init__(
+            self,
+            sync=ExecuteContextSymbol(
+                settrade_user=settrade_user,
+                account_no=account_no,
+                symbol=symbol,
+                pin=pin,
+                signal=signal,
+                snapshot=snapshot,
+                cache=cache,
+            ),
+            executor=executor,
+        )
+
+    @classmethod
+    def _from_sync(
+        cls, sync: ExecuteContextSymbol, executor: Optional[Executor] = None
+    ) -> "AsyncExecuteContextSymbol":
+        self = cls.__new__(cls)
+        _AsyncContext.__init__(self, sync=sync, executor=executor)
+        return self
+
+    """
+    Price functions
+    """
+
+    market_price = _async_property(ExecuteContextSymbol, "market_price")
+    best_bid_price = _async_property(ExecuteContextSymbol, "best_bid_price")
+    best_ask_price = _async_property(ExecuteContextSymbol, "best_ask_price")
+    price_age = _async_property(ExecuteContextSymbol, "price_age")
+    market_status = _async_property(ExecuteContextSymbol, "market_status")
+    bid_offer_history = _async_property(ExecuteContextSymbol, "bid_offer_history")
+
+    """
+    Position functions
+    """
+
+    volume = _async_property(ExecuteContextSymbol, "volume")
+    actual_volume = _async_property(ExecuteContextSymbol, "actual_volume")
+    current_volume = _async_property(ExecuteContextSymbol, "current_volume")
+    cost_price = _async_property(ExecuteContextSymbol, "cost_price")
+    cost_value = _async_property(ExecuteContextSymbol, "cost_value")
+    market_value = _async_property(ExecuteContextSymbol, "market_value")
+    profit = _async_property(ExecuteContextSymbol, "profit")
+    percent_profit = _async_method(ExecuteContextSymbol, "percent_profit")
+
+    """
+    Place order functions
+    """
+
+    buy = _async_method(ExecuteContextSymbol, "buy")
+    sell = _async_method(ExecuteContextSymbol, "sell")
+    buy_pct_port = _async_method(ExecuteContextSymbol, "buy_pct_port")
+    buy_value = _async_method(ExecuteContextSymbol, "buy_value")
+    sell_pct_port = _async_method(ExecuteContextSymbol, "sell_pct_port")
+    sell_value = _async_method(ExecuteContextSymbol, "sell_value")
+    target_pct_port = _async_method(ExecuteContextSymbol, "target_pct_port")
+    target_value = _async_method(ExecuteContextSymbol, "target_value")
+
+    """
+    Validate order functions
+    """
+
+    is_buy_sufficient = _async_method(ExecuteContextSymbol, "is_buy_sufficient")
+    is_sell_sufficient = _async_method(ExecuteContextSymbol, "is_sell_sufficient")
+    max_buy_volume = _async_method(ExecuteContextSymbol, "max_buy_volume")
+    max_sell_volume = _async_method(ExecuteContextSymbol, "max_sell_volume")
+
+    """
+    Override functions
+    """
+
+    get_portfolio = _async_method(ExecuteContextSymbol, "get_portfolio")
+    place_order = _async_method(ExecuteContextSymbol, "place_order")
+    get_quote_symbol = _async_method(ExecuteContextSymbol, "get_quote_symbol")
@@ -0,0 +1,217 @@
+from concurrent.futures import Executor
+from functools import lru_cache
+from typing import Any, Optional, Union
+
+from settrade_v2.user import Investor, MarketRep
+
+from .async_context import _async_method, _async_property, _AsyncContext
+from .cache import AccountSnapshot, ResponseCache
+from .derivative_context import ExecuteDerivativeContext, ExecuteDerivativeContextSymbol
+
+
+class AsyncExecuteDerivativeContext(_AsyncContext):
+    def __init__(
+        self,
+        settrade_user: Union[Investor, MarketRep],
+        account_no: str,
+        pin: Optional[str] = None,
+        snapshot: Optional[AccountSnapshot] = None,
+        cache: Optional[ResponseCache] = None,
+        executor: Optional[Executor] = None,
+    ):
+        """Async execute derivative context.
+
+        Same as ExecuteDerivativeContext but properties and methods are
+        coroutine functions that run Settrade SDK in executor. For example,
+        use `await ctx.port_value()` instead of `ctx.port_value`.
+
+        Parameters
+        ----------
+        settrade_user : Union[Investor, MarketRep]
+            Settrade user
+        account_no : str
+            Account number
+        pin : Optional[str], optional
+            PIN. Only for investor.
+        snapshot : Optional[AccountSnapshot], optional
+            Account snapshot shared with other contexts.
+        cache : Optional[ResponseCache], optional
+            Cache of account info, portfolios, orders and trades.
+        executor : Optional[Executor], optional
+            executor to run Settrade SDK functions. If None, use default
+            executor of the event loop.
+        """
+        super().__init__(
+            sync=ExecuteDerivativeContext(
+                settrade_user=settrade_user,
+                account_no=account_no,
+                pin=pin,
+                snapshot=snapshot,
+                cache=cache,
+            ),
+            executor=executor,
+        )
+
+    @lru_cache
+    def Symbol(self, symbol: str) -> "AsyncExecuteDerivativeContextSymbol":
+        return AsyncExecuteDerivativeContextSymbol._from_sync(
+            self.sync.Symbol(symbol), executor=self.executor
+        )
+
+    """
+    Account functions
+    """
+
+    excess_equity = _async_property(ExecuteDerivativeContext, "excess_equity")
+    cash_balance = _async_property(ExecuteDerivativeContext, "cash_balance")
+    total_cost_value = _async_property(ExecuteDerivativeContext, "total_cost_value")
+    total_market_value = _async_property(ExecuteDerivativeContext, "total_market_value")
+    port_value = _async_property(ExecuteDerivativeContext, "port_value")
+    cash = _async_property(ExecuteDerivativeContext, "cash")
+
+    """
+    Cancel order functions
+    """
+
+    cancel_orders = _async_method(ExecuteDerivativeContext, "cancel_orders")
+    cancel_long_orders = _async_method(ExecuteDerivativeContext, "cancel_long_orders")
+    cancel_short_orders = _async_method(ExecuteDerivativeContext, "cancel_short_orders")
+    cancel_price_orders = _async_method(ExecuteDerivativeContext, "cancel_price_orders")
+    cancel_all_orders = _async_method(ExecuteDerivativeContext, "cancel_all_orders")
+
+    """
+    Settrade SDK functions
+    """
+
+    get_account_info = _async_method(ExecuteDerivativeContext, "get_account_info")
+    get_portfolios = _async_method(ExecuteDerivativeContext, "get_portfolios")
+    get_orders = _async_method(ExecuteDerivativeContext, "get_orders")
+    get_trades = _async_method(ExecuteDerivativeContext, "get_trades")
+    get_portfolio = _async_method(ExecuteDerivativeContext, "get_portfolio")
+    place_order = _async_method(ExecuteDerivativeContext, "place_order")
+    get_quote_symbol = _async_method(ExecuteDerivativeContext, "get_quote_symbol")
+
+
+class AsyncExecuteDerivativeContextSymbol(AsyncExecuteDerivativeContext):
+    def __init__(
+        self,
+        settrade_user: Union[Investor, MarketRep],
+        account_no: str,
+        symbol: str,
+        pin: Optional[str] = None,
+        signal: Any = None,
+        snapshot: Optional[AccountSnapshot] = None,
+        cache: Optional[ResponseCache] = None,
+        executor: Optional[Executor] = None,
+    ):
+        """Async execute derivative context of symbol.
+
+        Same as ExecuteDerivativeContextSymbol but properties and methods
+        are coroutine functions that run Settrade SDK in executor.
+
+        Parameters
+        ----------
+        settrade_user : Union[Investor, MarketRep]
+            Settrade user
+        account_no : str
+            Account number
+        symbol : str
+            Selected symbol
+        pin : Optional[str], optional
+            PIN. Only for investor.
+        signal : Any, optional
+            Signal, by default None
+        snapshot : Optional[AccountSnapshot], optional
+            Account snapshot shared with other contexts.
+        cache : Optional[ResponseCache], optional
+            Cache of account info, portfolios, orders and trades.
+        executor : Optional[Executor], optional
+            executor to run Settrade SDK functions. If None, use default
+            executor of the event loop.
+        """
+        _AsyncContext.__init__(
+            self,
+            sync=ExecuteDerivativeContextSymbol(
+                settrade_user=settrade_user,
+                account_no=account_no,
+                symbol=symbol,
+                pin=pin,
+                signal=signal,
+                snapshot=snapshot,
+                cache=cache,
+            ),
+            executor=executor,
+        )
+
+    @classmethod
+    def _from_sync(
+        cls, sync: ExecuteDerivativeContextSymbol, executor: Optional[Executor] = None
+    ) -> "AsyncExecuteDerivativeContextSymbol":
+        self = cls.__new__(cls)
+        _AsyncContext.__init__(self, sync=sync, executor=executor)
+        return self
+
+    """
+    Price functions
+    """
+
+    market_price = _async_property(ExecuteDerivativeContextSymbol, "market_price")
+    best_bid_price = _async_property(ExecuteDerivativeContextSymbol, "best_bid_price")
+    best_ask_price = _async_property(ExecuteDerivativeContextSymbol, "best_ask_price")
+    price_age = _async_property(ExecuteDerivativeContextSymbol, "price_age")
+    market_status = _async_property(ExecuteDerivativeContextSymbol, "market_status")
+    bid_offer_history = _async_property(
+        ExecuteDerivativeContextSymbol, "bid_offer_history"
+    )
+
+    """
+    Position functions
+    """
+
+    volume = _async_property(ExecuteDerivativeContextSymbol, "volume")
+    actual_long_volume = _async_property(
+        ExecuteDerivativeContextSymbol, "actual_long_volume"
+    )
+    actual_short_volume = _async_property(
+        ExecuteDerivativeContextSymbol, "actual_short_volume"
+    )
+    available_long_volume = _async_property(
+        ExecuteDerivativeContextSymbol, "available_long_volume"
+    )
+    available_short_volume = _async_property(
+        ExecuteDerivativeContextSymbol, "available_short_volume"
+    )
+    long_avg_cost = _async_property(ExecuteDerivativeContextSymbol, "long_avg_cost")
+    short_avg_cost = _async_property(ExecuteDerivativeContextSymbol, "short_avg_cost")
+    long_avg_price = _async_property(ExecuteDerivativeContextSymbol, "long_avg_price")
+    short_avg_price = _async_property(ExecuteDerivativeContextSymbol, "short_avg_price")
+    long_market_value = _async_property(
+        ExecuteDerivativeContextSymbol, "long_market_value"
+    )
+    short_market_value = _async_property(
+        ExecuteDerivativeContextSymbol, "short_market_value"
+    )
+    profit = _async_property(ExecuteDerivativeContextSymbol, "profit")
+    long_profit = _async_property(ExecuteDerivativeContextSymbol, "long_profit")
+    short_profit = _async_property(ExecuteDerivativeContextSymbol, "short_profit")
+    percent_long_profit = _async_property(
+        ExecuteDerivativeContextSymbol, "percent_long_profit"
+    )
+    percent_short_profit = _async_property(
+        ExecuteDerivativeContextSymbol, "percent_short_profit"
+    )
+
+    """
+    Place order functions
+    """
+
+    buy = _async_method(ExecuteDerivativeContextSymbol, "buy")
+    sell = _async_method(ExecuteDerivativeContextSymbol, "sell")
+
+    """
+    Override functions
+    """
+
+    get_portfolio = _async_method(ExecuteDerivativeContextSymbol, "get_portfolio")
+    place_order = _async_method(ExecuteDerivativeContextSymbol, "place_order")
+    get_quote_symbol = _async_method(ExecuteDerivativeContextSymbol, "get_quote_symbol")
@@ -0,0 +1,188 @@
+import threading
+import time
+import weakref
+from collections import Counter
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar, Union
+
+from settrade_v2.context import Context
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+ACCOUNT_INFO = "account_info"
+PORTFOLIOS = "portfolios"
+ORDERS = "orders"
+TRADES = "trades"
+QUOTE_SYMBOL = "quote_symbol"
+
+# Entries that are changed by place order or cancel order
+WRITE_KEYS = (ACCOUNT_INFO, PORTFOLIOS, ORDERS)
+
+TTL_TYPE = Union[Optional[float], Dict[str, Optional[float]]]
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        ttl: TTL_TYPE = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        quote_ttl: Optional[float] = 0,
+    ):
+        """Cache of Settrade responses.
+
+        Parameters
+        ----------
+        ttl : Union[Optional[float], Dict[str, Optional[float]]], optional
+            seconds to keep each entry, by default 1.0. Can be dictionary of
+            key (account_info, portfolios, orders, trades) and seconds.
+            None is never expire. 0 or missing key in dictionary is not cached.
+        clock : Callable[[], float], optional
+            clock function, by default time.monotonic
+        quote_ttl : Optional[float], optional
+            seconds to keep quote of each symbol, by default 0 (not cached).
+            None is never expire.
+        """
+        self.ttl = ttl
+        self.clock = clock
+        self.quote_ttl = quote_ttl
+
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+        self._data: Dict[str, Tuple[Any, float]] = {}
+        # symbol -> (quote, expire time)
+        self._quotes: Dict[str, Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._generation = 0
+
+    @property
+    def hit_count(self) -> int:
+        """Total number of cache hits."""
+        return sum(self.hits.values())
+
+    @property
+    def miss_count(self) -> int:
+        """Total number of cache misses."""
+        return sum(self.misses.values())
+
+    def get(self, key: str, fetch: Callable[[], T]) -> T:
+        """Get entry of key. Call fetch if the entry is not exist or
+        expired."""
+        return self._get(self._data, key, key, self._get_ttl(key), fetch)
+
+    def get_quote(self, symbol: str, fetch: Callable[[], T]) -> T:
+        """Get quote of symbol. Call fetch if the quote is not exist or
+        expired. Hits and misses are counted in quote_symbol."""
+        return self._get(self._quotes, symbol, QUOTE_SYMBOL, self.quote_ttl, fetch)
+
+    def _get(
+        self,
+        data: Dict[str, Tuple[Any, float]],
+        key: str,
+        stats_key: str,
+        ttl: Optional[float],
+        fetch: Callable[[], T],
+    ) -> T:
+        if ttl == 0:
+            self.misses[stats_key] += 1
+            return fetch()
+
+        value = self._get_valid(data, key)
+        if value is not _MISSING:
+            self.hits[stats_key] += 1
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault((stats_key, key), threading.Lock())
+
+        # Only one thread fetch the same key, others wait for the result.
+        with key_lock:
+            value = self._get_valid(data, key)
+            if value is not _MISSING:
+                self.hits[stats_key] += 1
+                return value
+
+            self.misses[stats_key] += 1
+            generation = self._generation
+            value = fetch()
+            expire_at = float("inf") if ttl is None else self.clock() + ttl
+            with self._lock:
+                # Don't store value that was invalidated while fetching
+                if generation == self._generation:
+                    data[key] = (value, expire_at)
+            return value
+
+    def invalidate(self, *keys: str):
+        """Remove entries of keys. Next access will fetch new data."""
+        with self._lock:
+            self._generation += 1
+            for k in keys:
+                self._data.pop(k, None)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+            self._quotes.clear()
+
+    def reset_stats(self):
+        """Reset hit and miss counters."""
+        self.hits.clear()
+        self.misses.clear()
+
+    def _get_ttl(self, key: str) -> Optional[float]:
+        if isinstance(self.ttl, dict):
+            return self.ttl.get(key, 0)
+        return self.ttl
+
+    def _get_valid(self, data: Dict[str, Tuple[Any, float]], key: str) -> Any:
+        entry = data.get(key)
+        if entry is None or entry[1] <= self.clock():
+            return _MISSING
+        return entry[0]
+
+
+class AccountSnapshot(ResponseCache):
+    def __init__(self):
+        """Account info, portfolios, orders and trades shared by every context
+        in one iteration.
+
+        Each entry is fetched once on first access and kept until
+        `clear` is called at the start of the next iteration or until
+        `invalidate` is called after place order or cancel order.
+
+        Quotes are kept by symbol only if they are prefetched, other quote
+        requests always get a live quote.
+        """
+        super().__init__(ttl=None)
+        # symbol -> quote prefetched in this iteration
+        self.quotes: Dict[str, Any] = {}
+
+    def clear(self):
+        """Remove all entries and quotes."""
+        super().clear()
+        self.quotes.clear()
+
+
+"""
+Token refresh
+"""
+
+# Settrade context -> caches that use token of the context
+_token_refresh_caches: "weakref.WeakKeyDictionary[Context, weakref.WeakSet]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def watch_token_refresh(settrade_ctx: Context, cache: ResponseCache):
+    """Clear cache when token of settrade_ctx is refreshed."""
+    _token_refresh_caches.setdefault(settrade_ctx, weakref.WeakSet()).add(cache)
+
+
+def on_token_refresh(settrade_ctx: Context):
+    """Clear all caches that watch settrade_ctx."""
+    for cache in list(_token_refresh_caches.get(settrade_ctx, ())):
+        cache.clear()
@@ -5,6 +5,14 @@ logger = logging.getLogger(__name__)
 
 SETTRADE_ENVIRONMENT = os.getenv("SETTRADE_ENVIRONMENT")
 SETTRADE_COMMISSIION = float(os.getenv("SETTRADE_COMMISSIION", default=0.0025))  # 0.25%
+SETTRADE_CANCEL_CHUNK_SIZE = int(os.getenv("SETTRADE_CANCEL_CHUNK_SIZE", default=20))
+SETTRADE_CANCEL_MAX_WORKERS = int(os.getenv("SETTRADE_CANCEL_MAX_WORKERS", default=4))
+# Bid offer updates to keep per symbol, 0 to disable
+SETTRADE_BID_OFFER_HISTORY = int(os.getenv("SETTRADE_BID_OFFER_HISTORY", default=0))
+# Maximum seconds since the last realtime bid offer, 0 to disable
+SETTRADE_MAX_PRICE_AGE = float(os.getenv("SETTRADE_MAX_PRICE_AGE", default=0))
+# Maximum subscribed symbols of each realtime data, 0 for no limit
+SETTRADE_MAX_SUBSCRIPTIONS = int(os.getenv("SETTRADE_MAX_SUBSCRIPTIONS", default=0))
 
 
 def log_env(name: str):
@@ -13,4 +21,15 @@ def log_env(name: str):
         logger.info(f"Found {name} in environment variable. Setting {name} to {v}")
 
 
-[log_env(name) for name in ["SETTRADE_ENVIRONMENT", "SETTRADE_COMMISSIION"]]
+[
+    log_env(name)
+    for name in [
+        "SETTRADE_ENVIRONMENT",
+        "SETTRADE_COMMISSIION",
+        "SETTRADE_CANCEL_CHUNK_SIZE",
+        "SETTRADE_CANCEL_MAX_WORKERS",
+        "SETTRADE_BID_OFFER_HISTORY",
+        "SETTRADE_MAX_PRICE_AGE",
+        "SETTRADE_MAX_SUBSCRIPTIONS",
+    ]
+]
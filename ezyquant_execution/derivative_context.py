@@ -1,8 +1,9 @@
 import logging
 import time as t
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from functools import cached_property, lru_cache
-from typing import Any, Callable, Dict, List, Literal, Optional, TypeVar, Union
+from functools import cached_property, lru_cache, partial
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple, TypeVar, Union
 
 from settrade_v2.context import Context
 from settrade_v2.derivatives import InvestorDerivatives, MarketRepDerivatives
@@ -17,6 +18,19 @@ from ezyquant_execution.realtime import (
     PriceInfoSubscriberCache,
 )
 
+from . import config as cfg
+from . import utils
+from .cache import (
+    ACCOUNT_INFO,
+    ORDERS,
+    PORTFOLIOS,
+    TRADES,
+    WRITE_KEYS,
+    AccountSnapshot,
+    ResponseCache,
+    on_token_refresh,
+    watch_token_refresh,
+)
 from .derivative_entity import (
     CLOSE_POSITION,
     OPEN_POSITION,
@@ -36,6 +50,8 @@ from .derivative_entity import (
     DerivativeTrade,
     StockQuoteResponse,
 )
+from .history import BidOfferHistory
+from .metrics import timed
 
 logger = logging.getLogger(__name__)
 
@@ -56,10 +72,11 @@ def new_refresh(self):
     )
     if not res.ok:
         self.login()  # Added line
-        return
-    self.token = res.json()["access_token"]
-    self.refresh_token = res.json()["refresh_token"]
-    self.expired_at = int(t.time()) + res.json()["expires_in"]
+    else:
+        self.token = res.json()["access_token"]
+        self.refresh_token = res.json()["refresh_token"]
+        self.expired_at = int(t.time()) + res.json()["expires_in"]
+    on_token_refresh(self)  # Added line
 
 
 # Override refresh method
@@ -72,6 +89,9 @@ class ExecuteDerivativeContext:
         settrade_user: Union[Investor, MarketRep],
         account_no: str,
         pin: Optional[str] = None,
+        snapshot: Optional[AccountSnapshot] = None,
+        cache: Optional[ResponseCache] = None,
+        rt_conn: Optional[RealtimeDataConnection] = None,
     ):
         """Execute context.
 
@@ -83,13 +103,30 @@ class ExecuteDerivativeContext:
             Account number
         pin : Optional[str], optional
             PIN. Only for investor.
+        snapshot : Optional[AccountSnapshot], optional
+            Account snapshot shared with other contexts. If None, every
+            account function will request data from Settrade.
+        cache : Optional[ResponseCache], optional
+            Cache of account info, portfolios, orders and trades. Cache is
+            cleared when place order, cancel order or refresh token.
+        rt_conn : Optional[RealtimeDataConnection], optional
+            Realtime data connection. If None, use RealtimeDataConnection of
+            settrade_user.
         """
         self.settrade_user = settrade_user
         self.account_no = account_no
         self.pin = pin
+        self._snapshot = snapshot
+        self._cache = cache
+        self._rt_conn = rt_conn
+
+        settrade_ctx = getattr(settrade_user, "_ctx", None)
+        if cache is not None and settrade_ctx is not None:
+            watch_token_refresh(settrade_ctx, cache)
 
     def __eq__(self, other):
-        return self.__dict__ == other.__dict__
+        # Private attributes are cache and not part of the context identity
+        return _public_dict(self) == _public_dict(other)
 
     def __hash__(self):
         return id(self)
@@ -101,6 +138,9 @@ class ExecuteDerivativeContext:
             symbol=symbol,
             account_no=self.account_no,
             pin=self.pin,
+            snapshot=self._snapshot,
+            cache=self._cache,
+            rt_conn=self._rt_conn,
         )
 
     @property
@@ -169,14 +209,25 @@ class ExecuteDerivativeContext:
     """
 
     def cancel_orders(
-        self, condition: Callable[[DerivativeOrder], bool] = lambda _: True
+        self,
+        condition: Callable[[DerivativeOrder], bool] = lambda _: True,
+        chunk_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
     ) -> List[CancelOrder]:
         """Cancel orders.
 
+        Orders are split into chunks of chunk_size and each chunk is sent in
+        a separate request in parallel. A failed request doesn't affect other
+        chunks, orders of the failed chunk are returned with error_response.
+
         Parameters
         ----------
         condition: Callable[[dict], bool]
             condition function
+        chunk_size: Optional[int]
+            number of orders per request, by default SETTRADE_CANCEL_CHUNK_SIZE
+        max_workers: Optional[int]
+            number of requests in parallel, by default SETTRADE_CANCEL_MAX_WORKERS
 
         Returns
         -------
@@ -185,7 +236,19 @@ class ExecuteDerivativeContext:
         """
         orders = self.get_orders(lambda x: x.can_cancel and condition(x))
         order_no_list = [i.order_no for i in orders]
-        return self._cancel_orders(order_no_list)
+        return self._cancel_orders(order_no_list, chunk_size, max_workers)
+
+    def cancel_all_orders(self, chunk_size: Optional[int] = None) -> List[CancelOrder]:
+        """Cancel all orders as fast as possible, for example kill switch.
+
+        Request orders from Settrade without snapshot and cache, then send
+        every chunk of orders in parallel.
+        """
+        orders = self._filter_list(self._get_orders(), lambda x: x.can_cancel)
+        order_no_list = [i.order_no for i in orders]
+        return self._cancel_orders(
+            order_no_list, chunk_size, max_workers=len(order_no_list)
+        )
 
     def cancel_long_orders(self) -> List[CancelOrder]:
         """Cancel all buy orders."""
@@ -200,15 +263,41 @@ class ExecuteDerivativeContext:
         return self.cancel_orders(lambda x: x.price == price)
 
     def _cancel_orders(
-        self, order_no_list: List[int]
-    ) -> List[CancelOrder]:  # List[str] -> List[int]
+        self,
+        order_no_list: List[int],
+        chunk_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+    ) -> List[CancelOrder]:
         if not order_no_list:
             return []
-
-        res = self._settrade_derivative.cancel_orders(
-            order_no_list=order_no_list, **self._pin_acc_no_kw
-        )
-        out = [CancelOrder.from_camel_dict(i) for i in res["results"]]
+        if chunk_size is None:
+            chunk_size = cfg.SETTRADE_CANCEL_CHUNK_SIZE
+        if max_workers is None:
+            max_workers = cfg.SETTRADE_CANCEL_MAX_WORKERS
+
+        chunks = utils.chunked(order_no_list, chunk_size)
+        try:
+            if len(chunks) == 1:
+                results = [self._cancel_chunk(chunks[0])]
+            else:
+                with ThreadPoolExecutor(
+                    max_workers=max(min(max_workers, len(chunks)), 1)
+                ) as executor:
+                    results = list(executor.map(self._cancel_chunk, chunks))
+        finally:
+            self._invalidate_cache()
+
+        # Raise if every request failed, same as cancel in one request
+        errors = [i for i in results if isinstance(i, Exception)]
+        if len(errors) == len(results):
+            raise errors[0]
+
+        out = []
+        for chunk, res in zip(chunks, results):
+            if isinstance(res, Exception):
+                out += [CancelOrder.from_exception(i, res) for i in chunk]
+            else:
+                out += [CancelOrder.from_camel_dict(i) for i in res["results"]]
 
         for i in out:
             if i.error_response is not None:
@@ -218,11 +307,23 @@ class ExecuteDerivativeContext:
 
         return out
 
+    @timed("cancel_orders")
+    def _cancel_chunk(
+        self, order_no_list: List[int]
+    ) -> Union[Dict[str, Any], Exception]:
+        """Send one cancel request. Return exception instead of raise."""
+        try:
+            return self._settrade_derivative.cancel_orders(
+                order_no_list=order_no_list, **self._pin_acc_no_kw
+            )
+        except Exception as e:
+            return e
+
     """
     Settrade SDK functions
     """
 
-    @property
+    @cached_property
     def _acc_no_kw(self) -> dict:
         return (
             {"account_no": self.account_no}
@@ -230,7 +331,7 @@ class ExecuteDerivativeContext:
             else {}
         )
 
-    @property
+    @cached_property
     def _pin_acc_no_kw(self) -> dict:
         return (
             {"account_no": self.account_no}
@@ -238,7 +339,7 @@ class ExecuteDerivativeContext:
             else {"pin": self.pin}
         )
 
-    @property
+    @cached_property
     def _settrade_derivative(self) -> Union[InvestorDerivatives, MarketRepDerivatives]:
         kw = (
             {"account_no": self.account_no}
@@ -247,42 +348,79 @@ class ExecuteDerivativeContext:
         )
         return self.settrade_user.Derivatives(**kw)
 
-    @property
+    @cached_property
     def _settrade_market_data(self) -> MarketData:
         return self.settrade_user.MarketData()
 
-    @property
+    @cached_property
     def _settrade_realtime_data_connection(self) -> RealtimeDataConnection:
+        if self._rt_conn is not None:
+            return self._rt_conn
         return self.settrade_user.RealtimeDataConnection()
 
     def get_account_info(self) -> BaseAccountDerivativeInfo:
         """Get derivative account info."""
-        res = self._settrade_derivative.get_account_info(**self._acc_no_kw)
-        return BaseAccountDerivativeInfo.from_camel_dict(res)
+        return self._cached(ACCOUNT_INFO, self._get_account_info)
 
     def get_portfolios(self) -> DerivativePortfolioResponse:
         """Get portfolios."""
-        res: Dict[str, Any] = self._settrade_derivative.get_portfolios(**self._acc_no_kw)  # type: ignore
-        return DerivativePortfolioResponse.from_camel_dict(res)
+        return self._cached(PORTFOLIOS, self._get_portfolios)
 
     def get_orders(self, condition: Callable = lambda _: True) -> List[DerivativeOrder]:
         """Get orders."""
+        out = self._cached(ORDERS, self._get_orders)
+        out = self._filter_list(out, condition)
+        return out
+
+    def get_trades(self, condition: Callable = lambda _: True) -> List[DerivativeTrade]:
+        """Get trades."""
+        out = self._cached(TRADES, self._get_trades)
+        out = self._filter_list(out, condition)
+        return out
+
+    @timed("get_account_info")
+    def _get_account_info(self) -> BaseAccountDerivativeInfo:
+        res = self._settrade_derivative.get_account_info(**self._acc_no_kw)
+        return BaseAccountDerivativeInfo.from_camel_dict(res)
+
+    @timed("get_portfolios")
+    def _get_portfolios(self) -> DerivativePortfolioResponse:
+        res: Dict[str, Any] = self._settrade_derivative.get_portfolios(**self._acc_no_kw)  # type: ignore
+        return DerivativePortfolioResponse.from_camel_dict(res)
+
+    @timed("get_orders")
+    def _get_orders(self) -> Tuple[DerivativeOrder, ...]:
         if isinstance(self._settrade_derivative, InvestorDerivatives):
             res = self._settrade_derivative.get_orders()
         else:
             res = self._settrade_derivative.get_orders_by_account_no(
                 account_no=self.account_no
             )
-        out = [DerivativeOrder.from_camel_dict(i) for i in res]
-        out = self._filter_list(out, condition)
-        return out
+        return utils.SymbolTuple(DerivativeOrder.from_camel_dict(i) for i in res)
 
-    def get_trades(self, condition: Callable = lambda _: True) -> List[DerivativeTrade]:
-        """Get trades."""
+    @timed("get_trades")
+    def _get_trades(self) -> Tuple[DerivativeTrade, ...]:
         res = self._settrade_derivative.get_trades(**self._acc_no_kw)
-        out = [DerivativeTrade.from_camel_dict(i) for i in res]
-        out = self._filter_list(out, condition)
-        return out
+        return utils.SymbolTuple(DerivativeTrade.from_camel_dict(i) for i in res)
+
+    """
+    Cache functions
+    """
+
+    def _cached(self, key: str, fetch: Callable[[], T]) -> T:
+        """Get from snapshot, then from cache, then from Settrade."""
+        if self._cache is not None:
+            fetch = partial(self._cache.get, key, fetch)
+        if self._snapshot is not None:
+            return self._snapshot.get(key, fetch)
+        return fetch()
+
+    def _invalidate_cache(self):
+        """Invalidate entries that are changed by place order or cancel
+        order."""
+        for i in (self._snapshot, self._cache):
+            if i is not None:
+                i.invalidate(*WRITE_KEYS)
 
     """
     Override functions
@@ -290,12 +428,9 @@ class ExecuteDerivativeContext:
 
     def get_portfolio(self, symbol: str) -> Optional[DerivativePortfolio]:
         """Get portfolio of the symbol."""
-        res = self.get_portfolios()
-        for i in res.portfolio_list:
-            if i.symbol == symbol:
-                return i
-        return None
+        return self.get_portfolios().portfolio_dict.get(symbol)
 
+    @timed("place_order")
     def place_order(
         self,
         symbol: str,
@@ -315,25 +450,29 @@ class ExecuteDerivativeContext:
     ) -> Optional[DerivativeOrder]:
         logger.info(f"Place order: {side} {symbol} {volume} {price}")
 
-        res = self._settrade_derivative.place_order(
-            symbol=symbol,
-            side=side,
-            position=position,
-            price_type=price_type,
-            price=price,
-            volume=volume,
-            iceberg_vol=iceberg_vol,
-            validity_type=validity_type,
-            validity_date_condition=validity_date_condition,
-            stop_condition=stop_condition,
-            stop_symbol=stop_symbol,
-            stop_price=stop_price,
-            trigger_session=trigger_session,
-            bypass_warning=bypass_warning,
-            **self._pin_acc_no_kw,
-        )
+        try:
+            res = self._settrade_derivative.place_order(
+                symbol=symbol,
+                side=side,
+                position=position,
+                price_type=price_type,
+                price=price,
+                volume=volume,
+                iceberg_vol=iceberg_vol,
+                validity_type=validity_type,
+                validity_date_condition=validity_date_condition,
+                stop_condition=stop_condition,
+                stop_symbol=stop_symbol,
+                stop_price=stop_price,
+                trigger_session=trigger_session,
+                bypass_warning=bypass_warning,
+                **self._pin_acc_no_kw,
+            )
+        finally:
+            self._invalidate_cache()
         return DerivativeOrder.from_camel_dict(res)
 
+    @timed("get_quote_symbol")
     def get_quote_symbol(self, symbol: str) -> StockQuoteResponse:
         """Get quote symbol."""
         res = self._settrade_market_data.get_quote_symbol(symbol=symbol)
@@ -352,6 +491,9 @@ class ExecuteDerivativeContextSymbol(ExecuteDerivativeContext):
         symbol: str,
         pin: Optional[str] = None,
         signal: Any = None,
+        snapshot: Optional[AccountSnapshot] = None,
+        cache: Optional[ResponseCache] = None,
+        rt_conn: Optional[RealtimeDataConnection] = None,
     ):
         """Execute context.
 
@@ -367,10 +509,25 @@ class ExecuteDerivativeContextSymbol(ExecuteDerivativeContext):
             PIN. Only for investor.
         signal : Any, optional
             Signal, by default None
+        snapshot : Optional[AccountSnapshot], optional
+            Account snapshot shared with other contexts.
+        cache : Optional[ResponseCache], optional
+            Cache of account info, portfolios, orders and trades.
+        rt_conn : Optional[RealtimeDataConnection], optional
+            Realtime data connection shared with other contexts.
         """
-        super().__init__(settrade_user=settrade_user, account_no=account_no, pin=pin)
+        super().__init__(
+            settrade_user=settrade_user,
+            account_no=account_no,
+            pin=pin,
+            snapshot=snapshot,
+            cache=cache,
+            rt_conn=rt_conn,
+        )
         self.symbol = symbol
         self.signal = signal
+        # Raise StaleDataError if best bid/ask is older than seconds, None to disable
+        self.max_price_age: Optional[float] = cfg.SETTRADE_MAX_PRICE_AGE or None
 
     """
     Price functions
@@ -386,13 +543,38 @@ class ExecuteDerivativeContextSymbol(ExecuteDerivativeContext):
 
     @property
     def best_bid_price(self) -> float:
-        """Best bid price."""
-        return self._bo_sub.data.best_bid_price
+        """Best bid price.
+
+        Raise StaleDataError if realtime bid offer is older than
+        max_price_age.
+        """
+        return self._bo_sub.get_data(self.max_price_age).best_bid_price
 
     @property
     def best_ask_price(self) -> float:
-        """Best ask price."""
-        return self._bo_sub.data.best_ask_price
+        """Best ask price.
+
+        Raise StaleDataError if realtime bid offer is older than
+        max_price_age.
+        """
+        return self._bo_sub.get_data(self.max_price_age).best_ask_price
+
+    @property
+    def price_age(self) -> float:
+        """Seconds since the last realtime bid offer."""
+        return self._bo_sub.age
+
+    @property
+    def market_status(self) -> str:
+        """Market status of symbol from realtime price info, for example
+        OPEN1_E."""
+        return self._po_sub.data.market_status
+
+    @property
+    def bid_offer_history(self) -> Optional[BidOfferHistory]:
+        """Ring buffer of bid offer updates. None if history is disabled by
+        SETTRADE_BID_OFFER_HISTORY."""
+        return self._bo_sub.history
 
     """
     Position functions
@@ -541,13 +723,13 @@ class ExecuteDerivativeContextSymbol(ExecuteDerivativeContext):
     Settrade SDK functions
     """
 
-    @cached_property
+    @property
     def _bo_sub(self) -> BidOfferSubscriber:
         return BidOfferSubscriberCache(
             symbol=self.symbol, rt_conn=self._settrade_realtime_data_connection
         )
 
-    @cached_property
+    @property
     def _po_sub(self) -> PriceInfoSubscriber:
         return PriceInfoSubscriberCache(
             symbol=self.symbol, rt_conn=self._settrade_realtime_data_connection
@@ -638,6 +820,8 @@ class ExecuteDerivativeContextSymbol(ExecuteDerivativeContext):
 
     def _filter_list(self, l: List[T], condition: Callable = lambda _: True) -> List[T]:
         """Filter list by symbol and condition."""
+        if isinstance(l, utils.SymbolTuple):
+            return super()._filter_list(l.by_symbol.get(self.symbol, ()), condition)
         return super()._filter_list(
             l, lambda x: x.symbol == self.symbol and condition(x)
         )
@@ -647,3 +831,7 @@ def _is_pending_order(order: DerivativeOrder) -> bool:
     return order.balance_qty > 0 and "Expired" not in order.show_status
     # return order.can_cancel # This not work because GTC order can't cancel after market close
     # return order.balance > 0 # This not work because Expired order still have balance > 0
+
+
+def _public_dict(obj: object) -> dict:
+    return {k: v for k, v in vars(obj).items() if not k.startswith("_")}
@@ -1,6 +1,7 @@
 import inspect
-from dataclasses import dataclass
-from typing import Any, Dict, List, Literal, Optional
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Literal, Optional, Tuple
 
 import pandas as pd
 
@@ -132,13 +133,13 @@ class SettradeStruct:
     @classmethod
     def from_camel_dict(cls, dct: dict):
         snake_dct = {utils.camel_to_snake(k): v for k, v in dct.items()}
-        return cls(
-            **{
-                k: v
-                for k, v in snake_dct.items()
-                if k in inspect.signature(cls).parameters
-            }
-        )
+        parameters = _parameters(cls)
+        return cls(**{k: v for k, v in snake_dct.items() if k in parameters})
+
+
+@lru_cache(maxsize=None)
+def _parameters(cls: type) -> FrozenSet[str]:
+    return frozenset(inspect.signature(cls).parameters)
 
 
 @dataclass
@@ -175,17 +176,17 @@ class StockQuoteResponse(SettradeStruct):
 
 
 # Market Section
-@dataclass
+@dataclass(frozen=True)
 class BidOfferItem:
     price: float
     volume: int
 
 
-@dataclass
+@dataclass(frozen=True)
 class BidOffer:
     symbol: str
-    bids: List[BidOfferItem]
-    asks: List[BidOfferItem]
+    bids: Tuple[BidOfferItem, ...]
+    asks: Tuple[BidOfferItem, ...]
 
     @property
     def best_bid_price(self):
@@ -218,18 +219,17 @@ class BidOffer:
 
     @classmethod
     def from_dict(cls, data: dict):
-        bids = [
-            BidOfferItem(price=data[f"bid_price{i}"], volume=data[f"bid_volume{i}"])
-            for i in range(1, 11)
-        ]
-        asks = [
-            BidOfferItem(price=data[f"ask_price{i}"], volume=data[f"ask_volume{i}"])
-            for i in range(1, 11)
-        ]
+        bids = tuple(BidOfferItem(data[p], data[v]) for p, v in _BID_KEYS)
+        asks = tuple(BidOfferItem(data[p], data[v]) for p, v in _ASK_KEYS)
         return cls(data["symbol"], bids, asks)
 
 
-@dataclass
+# Price and volume keys of each level in bid offer data
+_BID_KEYS = tuple((f"bid_price{i}", f"bid_volume{i}") for i in range(1, 11))
+_ASK_KEYS = tuple((f"ask_price{i}", f"ask_volume{i}") for i in range(1, 11))
+
+
+@dataclass(frozen=True)
 class PriceInfo(SettradeStruct):
     symbol: str
     projected_open_price: Optional[float]
@@ -244,7 +244,7 @@ class PriceInfo(SettradeStruct):
     def __post_init__(self):
         for i in ["projected_open_price", "high", "low", "last"]:
             if not getattr(self, i):
-                setattr(self, i, None)
+                object.__setattr__(self, i, None)
 
 
 @dataclass
@@ -275,6 +275,13 @@ class BaseAccountInfo(SettradeStruct):
 class PortfolioResponse:
     portfolio_list: List["EquityPortfolio"]
     total_portfolio: "EquityPortfolio"
+    portfolio_dict: Dict[str, "EquityPortfolio"] = field(
+        init=False, repr=False, compare=False
+    )
+    """Symbol as key and portfolio as value"""
+
+    def __post_init__(self):
+        self.portfolio_dict = utils.index_by_symbol(self.portfolio_list)
 
     @classmethod
     def from_camel_dict(cls, dct: dict):
@@ -453,3 +460,16 @@ class CancelOrder(SettradeStruct):
     """HTTP status"""
     http_status_code: int
     """HTTP status code"""
+
+    @classmethod
+    def from_exception(cls, order_no: str, e: Exception):
+        """Cancel order result of order in failed cancel request."""
+        return cls(
+            order_no=order_no,
+            error_response={
+                "code": getattr(e, "code", type(e).__name__),
+                "message": str(e),
+            },
+            http_status="",
+            http_status_code=getattr(e, "status_code", 0),
+        )
@@ -1,24 +1,80 @@
 import asyncio
+import logging
+import multiprocessing
+import os
+import traceback
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
 from datetime import time
-from threading import Event, Timer
-from typing import Any, Awaitable, Callable, Dict, Optional, Union
+from functools import partial
+from threading import Event, RLock, Timer
+from time import monotonic
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 from settrade_v2.user import Investor, MarketRep
 
 from . import utils
-from .context import ExecuteContextSymbol
+from .async_context import AsyncExecuteContextSymbol
+from .cache import AccountSnapshot, ResponseCache
+from .context import ExecuteContext, ExecuteContextSymbol
+from .metrics import ITERATION, ON_TIMER, recorder, timed
+from .realtime import (
+    SubscriptionManager,
+    bo_sub_manager,
+    pi_sub_manager,
+    subscribe_many,
+)
+from .scheduler import IntervalScheduler, Scheduler, SymbolScheduler
+
+logger = logging.getLogger(__name__)
+
+# Signal dictionary or function that return signal dictionary
+SIGNAL_DICT_TYPE = Union[Dict[str, Any], Callable[[], Dict[str, Any]]]
+
+# Settrade user, account number, pin and signal dictionary
+ACCOUNT_TYPE = Tuple[Union[Investor, MarketRep], str, Optional[str], Dict[str, Any]]
+
+# Seconds to check event of execute_on_tick and execute_on_symbol_timer
+_TICK_POLL_INTERVAL = 0.1
+
+# Seconds to check event and worker processes of execute_on_timer_sharded
+_SHARD_POLL_INTERVAL = 0.1
 
 
 def execute_on_timer(
     settrade_user: Union[Investor, MarketRep],
     account_no: str,
-    signal_dict: Dict[str, Any],
+    signal_dict: SIGNAL_DICT_TYPE,
     on_timer: Callable[[ExecuteContextSymbol], None],
     interval: float,
     start_time: time,
     end_time: time,
     pin: Optional[str] = None,
     event: Optional[Event] = None,
+    cache: Optional[ResponseCache] = None,
+    prefetch: Iterable[str] = (),
+    prefetch_workers: Optional[int] = None,
+    scheduler: Optional[Scheduler] = None,
+    max_workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    warm_up: Iterable[str] = (),
+    warm_up_timeout: float = 30.0,
 ):
     """Execute.
 
@@ -26,14 +82,20 @@ def execute_on_timer(
     raise exception in on_timer to stop immediately,
     or set event.set() to stop after current iteration.
 
+    Account info, portfolios and orders are requested once per iteration and
+    shared by every symbol. Place order or cancel order will refresh them.
+
     Parameters
     ----------
     settrade_user : Investor
         settrade sdk user.
     account_no : str
         account number.
-    signal_dict : Dict[str, Any]
+    signal_dict : Union[Dict[str, Any], Callable[[], Dict[str, Any]]]
         signal dictionary. symbol as key and signal as value. this signal will pass to on_timer.
+        Can be dict that is updated by other thread or function that return
+        dict. It is read at the start of each iteration, contexts of new
+        symbols are created and contexts of removed symbols are dropped.
     on_timer : Callable[[ExecuteContextSymbol], None]
         custom function that iterate all symbol in signal_dict.
         if on_timer raise exception, this function will be stopped.
@@ -47,31 +109,544 @@ def execute_on_timer(
         pin for investor
     event : Event, optional
         event to stop execute on timer
+    cache : ResponseCache, optional
+        cache of account info, portfolios, orders and trades shared across
+        iterations.
+    prefetch : Iterable[str], optional
+        data to request in parallel at the start of each iteration.
+        account_info, portfolios, orders, trades or quote_symbol (quote of
+        every symbol in signal_dict). Quotes are only kept for the iteration
+        if quote_symbol is prefetched, otherwise market_price request a live
+        quote on every call.
+    prefetch_workers : int, optional
+        number of threads to request prefetch data.
+    scheduler : Scheduler, optional
+        when to run each iteration, by default IntervalScheduler(interval).
+        Use FixedRateScheduler to run every interval seconds regardless of
+        iteration time.
+    max_workers : int, optional
+        number of threads to run on_timer of symbols in parallel. If None and
+        executor is None, run on_timer of each symbol one by one.
+    executor : Executor, optional
+        executor to run on_timer of symbols and prefetch. The next iteration
+        start after on_timer of every symbol is done. If on_timer raise
+        exception, raise the first exception after every symbol is done.
+    warm_up : Iterable[str], optional
+        realtime data to subscribe for every symbol in signal_dict before
+        start time, bid_offer or price_info. Symbols are subscribed together
+        and the first iteration doesn't wait for subscription.
+    warm_up_timeout : float, optional
+        seconds to wait for the first data of all warm up symbols, by default 30.
+    """
+    on_timer = timed(ON_TIMER)(on_timer)
+    if event is None:
+        event = Event()
+
+    warm_up = tuple(warm_up)
+    if warm_up:
+        warm_up_subscriptions(
+            settrade_user,
+            _read_signal_dict(signal_dict),
+            is_bid_offer="bid_offer" in warm_up,
+            is_price_info="price_info" in warm_up,
+            timeout=warm_up_timeout,
+        )
+
+    # sleep until start time
+    utils.sleep_until(start_time, event=event)
+
+    prefetch = tuple(prefetch)
+    prefetch_executor = executor
+    if prefetch and executor is None:
+        prefetch_executor = ThreadPoolExecutor(max_workers=prefetch_workers)
+    on_timer_executor = executor
+    if max_workers is not None and executor is None:
+        on_timer_executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    if scheduler is None:
+        scheduler = IntervalScheduler(interval)
+
+    snapshot = AccountSnapshot()
+    prefetch_ctx = ExecuteContext(
+        settrade_user=settrade_user,
+        account_no=account_no,
+        pin=pin,
+        snapshot=snapshot,
+        cache=cache,
+    )
+    ctx_pool = _ContextPool(
+        partial(
+            ExecuteContextSymbol,
+            settrade_user=settrade_user,
+            account_no=account_no,
+            pin=pin,
+            snapshot=snapshot,
+            cache=cache,
+        )
+    )
+
+    timer = Timer(utils.seconds_until(end_time), event.set)
+    timer.start()
+
+    try:
+        # execute on_timer
+        scheduler.start()
+        while not event.wait(scheduler.next_timeout()):
+            if not scheduler.tick():
+                continue
+            with recorder.time(ITERATION):
+                signals = _read_signal_dict(signal_dict)
+                ctx_list = ctx_pool.update(signals)
+                snapshot.clear()
+                if prefetch:
+                    prefetch_ctx.prefetch(prefetch, signals, prefetch_executor)
+                if on_timer_executor is None:
+                    [on_timer(i) for i in ctx_list]
+                else:
+                    utils.run_parallel(
+                        [partial(on_timer, i) for i in ctx_list], on_timer_executor
+                    )
+
+    finally:
+        # note that event.set() and timer.cancel() can be called multiple times
+        event.set()
+        timer.cancel()
+        for i in (prefetch_executor, on_timer_executor):
+            if i is not None and i is not executor:
+                i.shutdown(wait=False)
+        ctx_pool.clear()
+
+
+def warm_up_subscriptions(
+    settrade_user: Union[Investor, MarketRep],
+    symbols: Iterable[str],
+    is_bid_offer: bool = True,
+    is_price_info: bool = False,
+    timeout: float = 30.0,
+) -> List[str]:
+    """Subscribe realtime data of symbols before the first iteration.
+
+    Every symbol is subscribed at once and the first data of all symbols is
+    waited with one deadline. Subscribers are shared with contexts, so
+    best_bid_price and market_status don't wait for subscription.
+
+    Parameters
+    ----------
+    settrade_user : Investor
+        settrade sdk user.
+    symbols : Iterable[str]
+        symbols to subscribe.
+    is_bid_offer : bool, optional
+        subscribe bid offer, by default True.
+    is_price_info : bool, optional
+        subscribe price info, by default False.
+    timeout : float, optional
+        seconds to wait for the first data of all symbols, by default 30.
+
+    Returns
+    -------
+    List[str]
+        symbols that don't receive the first data within timeout.
+    """
+    symbols = list(symbols)
+    failed = subscribe_many(
+        symbols,
+        settrade_user.RealtimeDataConnection(),
+        is_bid_offer=is_bid_offer,
+        is_price_info=is_price_info,
+        timeout=timeout,
+    )
+    if failed:
+        logger.warning(
+            f"Warm up {len(symbols) - len(failed)}/{len(symbols)} symbols,"
+            f" no data within {timeout}s: {failed}"
+        )
+    else:
+        logger.info(f"Warm up {len(symbols)} symbols")
+    return failed
+
+
+def _read_signal_dict(signal_dict: SIGNAL_DICT_TYPE) -> Dict[str, Any]:
+    """Copy of signal dictionary of this iteration."""
+    if callable(signal_dict):
+        return dict(signal_dict())
+    # copy of dict is atomic, safe when other thread update signal_dict
+    return dict(signal_dict)
+
+
+class _ContextPool:
+    def __init__(
+        self,
+        make_ctx: Callable[..., Any],
+        managers: Optional[Iterable[SubscriptionManager]] = None,
+    ):
+        """Keep context of each symbol across iterations.
+
+        make_ctx is called with symbol and signal keyword arguments. Symbols
+        of contexts are acquired in managers, by default bo_sub_manager and
+        pi_sub_manager, and released when removed. Released symbols stay
+        subscribed until they are evicted by max_size of managers.
+        """
+        self.make_ctx = make_ctx
+        self.managers = (
+            (bo_sub_manager, pi_sub_manager) if managers is None else tuple(managers)
+        )
+        self._ctx_dict: Dict[str, Any] = {}
+
+    def update(self, signal_dict: Dict[str, Any]) -> List[Any]:
+        """Return contexts of signal_dict.
+
+        Create contexts of new symbols, drop contexts of removed symbols
+        and update signal of others.
+        """
+        for k in self._ctx_dict.keys() - signal_dict.keys():
+            self._remove(k)
+
+        for k, v in signal_dict.items():
+            ctx = self._ctx_dict.get(k)
+            if ctx is None:
+                self._ctx_dict[k] = self.make_ctx(symbol=k, signal=v)
+                for i in self.managers:
+                    i.acquire(k)
+            else:
+                # async context keep signal in sync context
+                getattr(ctx, "sync", ctx).signal = v
+
+        return [self._ctx_dict[k] for k in signal_dict]
+
+    def clear(self):
+        """Drop all contexts."""
+        for k in list(self._ctx_dict):
+            self._remove(k)
+
+    def _remove(self, symbol: str):
+        del self._ctx_dict[symbol]
+        for i in self.managers:
+            i.release(symbol)
+
+
+def execute_on_timer_accounts(
+    accounts: Iterable[ACCOUNT_TYPE],
+    on_timer: Callable[[ExecuteContextSymbol], None],
+    interval: float,
+    start_time: time,
+    end_time: time,
+    event: Optional[Event] = None,
+    scheduler: Optional[Scheduler] = None,
+    max_workers: Optional[int] = None,
+):
+    """Execute the same on_timer for many accounts in one loop.
+
+    Each account has its own account snapshot. Bid offer and price info
+    subscriptions are shared by every account of the same symbol, on the
+    realtime data connection of the first account. Accounts
+    run in parallel on one thread pool, symbols of an account run one by one.
+    The next iteration start after every account is done. If on_timer raise
+    exception, raise the first exception after every account is done.
+
+    Parameters
+    ----------
+    accounts : Iterable[Tuple[Union[Investor, MarketRep], str, Optional[str], Dict[str, Any]]]
+        settrade user, account number, pin and signal dictionary of each account.
+    on_timer : Callable[[ExecuteContextSymbol], None]
+        custom function that iterate all symbol in signal dictionary of each account.
+    interval : float
+        seconds to sleep between each iteration.
+    start_time : time
+        time to start.
+    end_time : time
+        time to end. end time will not interrupt while iteration.
+    event : Event, optional
+        event to stop execute on timer
+    scheduler : Scheduler, optional
+        when to run each iteration, by default IntervalScheduler(interval).
+    max_workers : int, optional
+        number of threads to run accounts, by default ThreadPoolExecutor default.
     """
+    on_timer = timed(ON_TIMER)(on_timer)
     if event is None:
         event = Event()
 
     # sleep until start time
     utils.sleep_until(start_time, event=event)
 
+    if scheduler is None:
+        scheduler = IntervalScheduler(interval)
+
     timer = Timer(utils.seconds_until(end_time), event.set)
     timer.start()
 
     try:
-        ctx_list = [
-            ExecuteContextSymbol(
+        accounts = list(accounts)
+        # One connection for every account, RealtimeDataConnection of many
+        # users would replace each other in its cache and subscribe again
+        rt_conn = accounts[0][0].RealtimeDataConnection() if accounts else None
+
+        account_list = []
+        for settrade_user, account_no, pin, signal_dict in accounts:
+            snapshot = AccountSnapshot()
+            ctx_list = [
+                ExecuteContextSymbol(
+                    symbol=k,
+                    signal=v,
+                    settrade_user=settrade_user,
+                    account_no=account_no,
+                    pin=pin,
+                    snapshot=snapshot,
+                    rt_conn=rt_conn,
+                )
+                for k, v in signal_dict.items()
+            ]
+            account_list.append((snapshot, ctx_list))
+
+        def run_account(snapshot: AccountSnapshot, ctx_list: list):
+            snapshot.clear()
+            [on_timer(i) for i in ctx_list]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # execute on_timer
+            scheduler.start()
+            while not event.wait(scheduler.next_timeout()):
+                if not scheduler.tick():
+                    continue
+                with recorder.time(ITERATION):
+                    utils.run_parallel(
+                        [partial(run_account, *i) for i in account_list], executor
+                    )
+
+    finally:
+        # note that event.set() and timer.cancel() can be called multiple times
+        event.set()
+        timer.cancel()
+
+
+def execute_on_timer_sharded(
+    settrade_user: Union[Investor, MarketRep, Callable[[], Union[Investor, MarketRep]]],
+    account_no: str,
+    signal_dict: Dict[str, Any],
+    on_timer: Callable[[ExecuteContextSymbol], None],
+    interval: float,
+    start_time: time,
+    end_time: time,
+    pin: Optional[str] = None,
+    event: Optional[Event] = None,
+    n_shards: Optional[int] = None,
+    **kwargs,
+):
+    """Same as execute_on_timer but split signal_dict across worker processes.
+
+    Each worker process run execute_on_timer with its own shard of
+    signal_dict and its own account snapshot, so per-symbol work is not
+    limited by the GIL.
+
+    Account data is not aggregated across workers. Each worker requests
+    account info, portfolios and orders from Settrade every iteration, so
+    n_shards workers send n_shards times the account requests of
+    execute_on_timer. Workers don't see orders and cash used by other
+    workers in the same iteration. port_value is the value of the whole
+    account, so weights for target_pct_port should be fractions of the whole
+    portfolio as in execute_on_timer, not of the shard. Buy orders of all
+    workers are sized against the same cash, so scale weights before calling
+    this function so that the sum of weight increases of all symbols is not
+    more than cash / port_value of the account.
+
+    To stop execute on timer,
+    raise exception in on_timer to stop every worker after its current
+    iteration, or set event.set() to stop after current iteration.
+
+    Parameters
+    ----------
+    settrade_user : Union[Investor, MarketRep, Callable[[], Union[Investor, MarketRep]]]
+        settrade sdk user, or picklable function that return settrade sdk
+        user which is called in each worker to login separately.
+    signal_dict : Dict[str, Any]
+        signal dictionary that is split across workers once at start. Unlike
+        execute_on_timer, function that return dict is not supported.
+    n_shards : int, optional
+        number of worker processes, by default number of CPUs.
+    **kwargs
+        other parameters of execute_on_timer.
+
+    on_timer, signal values and other parameters must be picklable, for
+    example on_timer must be a module level function. See execute_on_timer
+    for other parameters.
+    """
+    if event is None:
+        event = Event()
+    if n_shards is None:
+        n_shards = os.cpu_count() or 1
+
+    shard_list = [i for i in utils.split_dict(signal_dict, n_shards) if i]
+    mp_ctx = multiprocessing.get_context("spawn")
+    stop_event = mp_ctx.Event()
+    error_queue = mp_ctx.Queue()
+
+    process_list = [
+        mp_ctx.Process(
+            target=_run_shard,
+            kwargs=dict(
+                settrade_user=settrade_user,
+                account_no=account_no,
+                signal_dict=shard,
+                on_timer=on_timer,
+                interval=interval,
+                start_time=start_time,
+                end_time=end_time,
+                pin=pin,
+                event=stop_event,
+                error_queue=error_queue,
+                **kwargs,
+            ),
+            daemon=True,
+        )
+        for shard in shard_list
+    ]
+
+    try:
+        [i.start() for i in process_list]
+
+        # Bridge event and stop event until every worker is done
+        while any(i.is_alive() for i in process_list):
+            if event.wait(_SHARD_POLL_INTERVAL) or stop_event.is_set():
+                stop_event.set()
+                event.set()
+
+    finally:
+        # note that event.set() can be called multiple times
+        stop_event.set()
+        event.set()
+        [i.join() for i in process_list]
+
+    if not error_queue.empty():
+        raise RuntimeError(f"Worker process failed\n{error_queue.get()}")
+
+
+def _run_shard(error_queue, **kwargs):
+    """Run execute_on_timer in worker process and send error to
+    coordinator."""
+    event = kwargs["event"]
+    try:
+        if callable(kwargs["settrade_user"]):
+            kwargs["settrade_user"] = kwargs["settrade_user"]()
+        execute_on_timer(**kwargs)
+    except Exception:
+        error_queue.put(traceback.format_exc())
+        event.set()
+
+
+def execute_on_symbol_timer(
+    settrade_user: Union[Investor, MarketRep],
+    account_no: str,
+    signal_dict: Dict[str, Any],
+    on_timer: Callable[[ExecuteContextSymbol], None],
+    interval: Union[float, Dict[str, float], Callable[[Any], float]],
+    start_time: time,
+    end_time: time,
+    pin: Optional[str] = None,
+    event: Optional[Event] = None,
+    cache: Optional[ResponseCache] = None,
+    priority: Union[None, Dict[str, int], Callable[[Any], int]] = None,
+    max_workers: Optional[int] = None,
+):
+    """Execute each symbol with its own interval.
+
+    Symbols are kept in a heap by time of the next run and run on one thread
+    pool. on_timer of the same symbol never run at the same time. Account
+    info, portfolios and orders are shared by symbols that are due together.
+    Each batch of due symbols has its own account snapshot, so symbols that
+    are still running keep their account data.
+
+    To stop execute on symbol timer,
+    raise exception in on_timer to stop after running on_timer are done,
+    or set event.set() to stop.
+
+    Parameters
+    ----------
+    settrade_user : Investor
+        settrade sdk user.
+    account_no : str
+        account number.
+    signal_dict : Dict[str, Any]
+        signal dictionary. symbol as key and signal as value. this signal will pass to on_timer.
+    on_timer : Callable[[ExecuteContextSymbol], None]
+        custom function that is called when symbol is due.
+        if on_timer raise exception, this function will be stopped.
+    interval : Union[float, Dict[str, float], Callable[[Any], float]]
+        seconds between each run of symbol. Can be float for every symbol,
+        dictionary of symbol and seconds, or function of signal that return
+        seconds.
+    start_time : time
+        time to start.
+    end_time : time
+        time to end.
+    pin : str, optional
+        pin for investor
+    event : Event, optional
+        event to stop execute on symbol timer
+    cache : ResponseCache, optional
+        cache of account info, portfolios, orders and trades.
+    priority : Union[Dict[str, int], Callable[[Any], int]], optional
+        priority of symbol, dictionary of symbol and priority or function of
+        signal that return priority. If more symbols are due than workers,
+        lower priority run first. by default 0.
+    max_workers : int, optional
+        number of threads to run on_timer, by default ThreadPoolExecutor default.
+    """
+    on_timer = timed(ON_TIMER)(on_timer)
+    if event is None:
+        event = Event()
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) + 4)
+
+    # sleep until start time
+    utils.sleep_until(start_time, event=event)
+
+    timer = Timer(utils.seconds_until(end_time), event.set)
+    timer.start()
+
+    try:
+        ctx_dict = {
+            k: ExecuteContextSymbol(
                 symbol=k,
                 signal=v,
                 settrade_user=settrade_user,
                 account_no=account_no,
                 pin=pin,
+                cache=cache,
             )
             for k, v in signal_dict.items()
-        ]
+        }
+        intervals = {
+            k: _get_symbol_value(interval, k, v) for k, v in signal_dict.items()
+        }
+        if priority is None or isinstance(priority, dict):
+            priorities = priority
+        else:
+            priorities = {k: priority(v) for k, v in signal_dict.items()}
+        scheduler = SymbolScheduler(intervals=intervals, priorities=priorities)
 
-        # execute on_timer
-        while not event.wait(interval):
-            [on_timer(i) for i in ctx_list]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            running: Dict[Future, str] = {}
+            while not event.is_set():
+                symbol_list = scheduler.pop_due(max_workers - len(running))
+                # Symbols that are due are not running, replace their snapshot
+                snapshot = AccountSnapshot()
+                for symbol in symbol_list:
+                    ctx = ctx_dict[symbol]
+                    ctx._snapshot = snapshot
+                    running[executor.submit(on_timer, ctx)] = symbol
+
+                timeout = scheduler.next_timeout()
+                if timeout is None or timeout > _TICK_POLL_INTERVAL:
+                    timeout = _TICK_POLL_INTERVAL
+                if not running:
+                    event.wait(timeout)
+                    continue
+
+                done, _ = wait(running, timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    scheduler.push(running.pop(future))
+                    future.result()
 
     finally:
         # note that event.set() and timer.cancel() can be called multiple times
@@ -79,44 +654,357 @@ def execute_on_timer(
         timer.cancel()
 
 
+def _get_symbol_value(value: Any, symbol: str, signal: Any) -> Any:
+    """Value of symbol from constant, dictionary of symbol or function of
+    signal."""
+    if isinstance(value, dict):
+        return value[symbol]
+    if callable(value):
+        return value(signal)
+    return value
+
+
 async def async_execute_on_timer(
     settrade_user: Union[Investor, MarketRep],
     account_no: str,
-    signal_dict: Dict[str, Any],
-    on_timer: Callable[[ExecuteContextSymbol], Awaitable[None]],
+    signal_dict: SIGNAL_DICT_TYPE,
+    on_timer: Callable[
+        [Union[ExecuteContextSymbol, AsyncExecuteContextSymbol]], Awaitable[None]
+    ],
     interval: float,
     start_time: time,
     end_time: time,
     pin: Optional[str] = None,
     event: Optional[asyncio.Event] = None,
+    cache: Optional[ResponseCache] = None,
+    prefetch: Iterable[str] = (),
+    prefetch_workers: Optional[int] = None,
+    is_async_context: bool = False,
+    executor: Optional[Executor] = None,
+    scheduler: Optional[Scheduler] = None,
+    is_concurrent: bool = False,
+    max_concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+    on_results: Optional[Callable[[Dict[str, Any]], Any]] = None,
 ):
-    """Same as execute_on_timer but on_timer is async function."""
+    """Same as execute_on_timer but on_timer is async function.
+
+    Parameters
+    ----------
+    is_async_context : bool, optional
+        if True, pass AsyncExecuteContextSymbol to on_timer instead of
+        ExecuteContextSymbol, so Settrade SDK functions don't block the event
+        loop.
+    executor : Executor, optional
+        executor to run Settrade SDK functions of async context and prefetch.
+        If None, async context use default executor of the event loop and
+        prefetch create thread pool of prefetch_workers threads.
+    is_concurrent : bool, optional
+        if True, await on_timer of every symbol concurrently. The next
+        iteration start after on_timer of every symbol is done.
+    max_concurrency : int, optional
+        maximum number of on_timer running at the same time, by default no
+        limit. Only if is_concurrent.
+    timeout : float, optional
+        seconds for on_timer of each symbol, asyncio.TimeoutError if timeout.
+        Only if is_concurrent. Timeout doesn't cancel Settrade API calls that
+        already run in the executor, e.g. an order may still be placed after
+        timeout. Use it to stop waiting, not to abort orders.
+    on_results : Callable[[Dict[str, Any]], Any], optional
+        function that receive symbol as key and result or exception of
+        on_timer as value after each iteration. If None, raise the first
+        exception. Only if is_concurrent.
+    """
+    on_timer = partial(_async_timed_on_timer, on_timer)
     if event is None:
         event = asyncio.Event()
 
     # sleep until start time
     await utils.async_sleep_until(start_time, event=event)
 
+    prefetch = tuple(prefetch)
+    prefetch_executor = executor
+    if prefetch and executor is None:
+        prefetch_executor = ThreadPoolExecutor(max_workers=prefetch_workers)
+
+    if scheduler is None:
+        scheduler = IntervalScheduler(interval)
+
+    snapshot = AccountSnapshot()
+    prefetch_ctx = ExecuteContext(
+        settrade_user=settrade_user,
+        account_no=account_no,
+        pin=pin,
+        snapshot=snapshot,
+        cache=cache,
+    )
+    ctx_pool = _ContextPool(
+        partial(
+            ExecuteContextSymbol,
+            settrade_user=settrade_user,
+            account_no=account_no,
+            pin=pin,
+            snapshot=snapshot,
+            cache=cache,
+        )
+    )
+    if is_async_context:
+        ctx_pool = _ContextPool(
+            lambda **kw: AsyncExecuteContextSymbol._from_sync(
+                ExecuteContextSymbol(
+                    settrade_user=settrade_user,
+                    account_no=account_no,
+                    pin=pin,
+                    snapshot=snapshot,
+                    cache=cache,
+                    **kw,
+                ),
+                executor=executor,
+            )
+        )
+
     timer = Timer(utils.seconds_until(end_time), event.set)
     timer.start()
 
     try:
-        ctx_list = [
-            ExecuteContextSymbol(
+        # execute on_timer
+        scheduler.start()
+        while not await utils.async_event_wait(event, scheduler.next_timeout()):
+            if not scheduler.tick():
+                continue
+            with recorder.time(ITERATION):
+                signals = _read_signal_dict(signal_dict)
+                ctx_list = ctx_pool.update(signals)
+                snapshot.clear()
+                if prefetch:
+                    await prefetch_ctx.async_prefetch(
+                        prefetch, signals, prefetch_executor
+                    )
+                if not is_concurrent:
+                    [await on_timer(i) for i in ctx_list]
+                    continue
+
+                results = await utils.async_gather_dict(
+                    {i.symbol: partial(on_timer, i) for i in ctx_list},
+                    max_concurrency=max_concurrency,
+                    timeout=timeout,
+                )
+                if on_results is not None:
+                    on_results(results)
+                else:
+                    for v in results.values():
+                        if isinstance(v, Exception):
+                            raise v
+
+    finally:
+        # note that event.set() and timer.cancel() can be called multiple times
+        event.set()
+        timer.cancel()
+        if prefetch_executor is not None and prefetch_executor is not executor:
+            prefetch_executor.shutdown(wait=False)
+        ctx_pool.clear()
+
+
+async def _async_timed_on_timer(on_timer: Callable[[Any], Awaitable[None]], ctx: Any):
+    with recorder.time(ON_TIMER, ctx.symbol):
+        return await on_timer(ctx)
+
+
+def execute_on_tick(
+    settrade_user: Union[Investor, MarketRep],
+    account_no: str,
+    signal_dict: Dict[str, Any],
+    on_tick: Callable[[ExecuteContextSymbol], None],
+    start_time: time,
+    end_time: time,
+    pin: Optional[str] = None,
+    event: Optional[Event] = None,
+    cache: Optional[ResponseCache] = None,
+    is_bid_offer: bool = True,
+    is_price_info: bool = False,
+    debounce: float = 0.0,
+    max_in_flight: int = 1,
+    warm_up_timeout: float = 30.0,
+):
+    """Execute on realtime update.
+
+    Call on_tick of a symbol when its bid offer or price info receive new
+    data, and once for every symbol at start. Updates of a symbol that
+    arrive while on_tick of the symbol is waiting or running are coalesced
+    into one call. on_tick of the same symbol never run at the same time.
+
+    To stop execute on tick,
+    raise exception in on_tick to stop after running on_tick are done,
+    or set event.set() to stop.
+
+    Parameters
+    ----------
+    settrade_user : Investor
+        settrade sdk user.
+    account_no : str
+        account number.
+    signal_dict : Dict[str, Any]
+        signal dictionary. symbol as key and signal as value. this signal will pass to on_tick.
+    on_tick : Callable[[ExecuteContextSymbol], None]
+        custom function that is called on update of symbol.
+        if on_tick raise exception, this function will be stopped.
+    start_time : time
+        time to start.
+    end_time : time
+        time to end.
+    pin : str, optional
+        pin for investor
+    event : Event, optional
+        event to stop execute on tick
+    cache : ResponseCache, optional
+        cache of account info, portfolios, orders and trades.
+    is_bid_offer : bool, optional
+        call on_tick on bid offer update, by default True.
+    is_price_info : bool, optional
+        call on_tick on price info update, by default False.
+    debounce : float, optional
+        seconds to wait after the first update of a symbol to collect a burst
+        of updates into one call, by default 0.
+    max_in_flight : int, optional
+        maximum number of on_tick running at the same time, by default 1.
+    warm_up_timeout : float, optional
+        seconds to wait for the first data of all symbols before start time,
+        by default 30.
+    """
+    on_tick = timed(ON_TIMER)(on_tick)
+    if event is None:
+        event = Event()
+
+    # subscribe every symbol together, not one by one at the first tick
+    warm_up_subscriptions(
+        settrade_user,
+        signal_dict,
+        is_bid_offer=is_bid_offer,
+        is_price_info=is_price_info,
+        timeout=warm_up_timeout,
+    )
+
+    # sleep until start time
+    utils.sleep_until(start_time, event=event)
+
+    timer = Timer(utils.seconds_until(end_time), event.set)
+    timer.start()
+
+    dispatcher = _TickDispatcher(
+        on_tick=on_tick, debounce=debounce, max_in_flight=max_in_flight
+    )
+    managers: List[SubscriptionManager] = []
+    if is_bid_offer:
+        managers.append(bo_sub_manager)
+    if is_price_info:
+        managers.append(pi_sub_manager)
+    registered_list = []
+
+    try:
+        rt_conn = settrade_user.RealtimeDataConnection()
+        for k, v in signal_dict.items():
+            ctx = ExecuteContextSymbol(
                 symbol=k,
                 signal=v,
                 settrade_user=settrade_user,
                 account_no=account_no,
                 pin=pin,
+                cache=cache,
+                rt_conn=rt_conn,
             )
-            for k, v in signal_dict.items()
-        ]
+            dispatcher.add(ctx)
 
-        # execute on_timer
-        while not await utils.async_event_wait(event, interval):
-            [await on_timer(i) for i in ctx_list]
+            for manager in managers:
+                # Acquire before get, so symbol with callback is never evicted
+                sub = manager.acquire(ctx.symbol, rt_conn, is_wait=False)
+                callback = partial(dispatcher.mark, ctx.symbol)
+                sub.register_callback(callback)
+                registered_list.append((manager, ctx.symbol, sub, callback))
+
+        # execute on_tick
+        dispatcher.run(event)
 
     finally:
         # note that event.set() and timer.cancel() can be called multiple times
         event.set()
         timer.cancel()
+        for manager, symbol, sub, callback in registered_list:
+            sub.unregister_callback(callback)
+            manager.release(symbol)
+
+
+class _TickDispatcher:
+    def __init__(
+        self,
+        on_tick: Callable[[ExecuteContextSymbol], None],
+        debounce: float = 0.0,
+        max_in_flight: int = 1,
+        clock: Callable[[], float] = monotonic,
+    ):
+        """Run on_tick of updated symbols on thread pool."""
+        if max_in_flight < 1:
+            raise ValueError(f"max_in_flight must be positive, got {max_in_flight}")
+
+        self.on_tick = on_tick
+        self.debounce = debounce
+        self.max_in_flight = max_in_flight
+        self.clock = clock
+
+        self._ctx_dict: Dict[str, ExecuteContextSymbol] = {}
+        # symbol -> time of the first update that is not dispatched
+        self._dirty: Dict[str, float] = {}
+        self._in_flight: Set[str] = set()
+        self._error: Optional[Exception] = None
+        # reentrant because done callback run in the caller if future is done
+        self._lock = RLock()
+        self._wake = Event()
+
+    def add(self, ctx: ExecuteContextSymbol):
+        """Add context of symbol and mark it as updated."""
+        self._ctx_dict[ctx.symbol] = ctx
+        self.mark(ctx.symbol)
+
+    def mark(self, symbol: str):
+        """Mark symbol as updated. Called on Settrade thread."""
+        with self._lock:
+            self._dirty.setdefault(symbol, self.clock())
+        self._wake.set()
+
+    def run(self, event: Event):
+        """Dispatch updated symbols until event is set or on_tick raise."""
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            while not event.is_set() and self._error is None:
+                self._wake.clear()
+                timeout = self._dispatch(executor)
+                self._wake.wait(timeout)
+
+        if self._error is not None:
+            raise self._error
+
+    def _dispatch(self, executor: Executor) -> float:
+        """Submit symbols that are ready. Return seconds to wait."""
+        timeout = _TICK_POLL_INTERVAL
+        with self._lock:
+            now = self.clock()
+            for symbol, updated_at in list(self._dirty.items()):
+                if len(self._in_flight) >= self.max_in_flight:
+                    break
+                if symbol in self._in_flight:
+                    continue
+                remaining = updated_at + self.debounce - now
+                if remaining > 0:
+                    timeout = min(timeout, remaining)
+                    continue
+
+                del self._dirty[symbol]
+                self._in_flight.add(symbol)
+                future = executor.submit(self.on_tick, self._ctx_dict[symbol])
+                future.add_done_callback(partial(self._on_done, symbol))
+        return timeout
+
+    def _on_done(self, symbol: str, future: Future):
+        with self._lock:
+            self._in_flight.discard(symbol)
+            if future.exception() is not None and self._error is None:
+                self._error = future.exception()  # type: ignore
+        self._wake.set()
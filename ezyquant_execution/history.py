@@ -0,0 +1,192 @@
+import time
+from threading import Lock
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+N_LEVEL = 10
+
+# Price and volume keys of each level in bid offer data
+_BID_PRICE_KEYS = tuple(f"bid_price{i}" for i in range(1, N_LEVEL + 1))
+_BID_VOLUME_KEYS = tuple(f"bid_volume{i}" for i in range(1, N_LEVEL + 1))
+_ASK_PRICE_KEYS = tuple(f"ask_price{i}" for i in range(1, N_LEVEL + 1))
+_ASK_VOLUME_KEYS = tuple(f"ask_volume{i}" for i in range(1, N_LEVEL + 1))
+
+
+class BidOfferWindow(NamedTuple):
+    """Bid offer updates from oldest to newest.
+
+    timestamp has shape (n,), other arrays have shape (n, 10) with best
+    level at column 0.
+    """
+
+    timestamp: np.ndarray
+    bid_price: np.ndarray
+    bid_volume: np.ndarray
+    ask_price: np.ndarray
+    ask_volume: np.ndarray
+
+    @property
+    def spread(self) -> np.ndarray:
+        """Best ask price minus best bid price."""
+        return self.ask_price[:, 0] - self.bid_price[:, 0]
+
+    @property
+    def mid_price(self) -> np.ndarray:
+        """Mean of best bid price and best ask price."""
+        return (self.ask_price[:, 0] + self.bid_price[:, 0]) / 2
+
+    @property
+    def microprice(self) -> np.ndarray:
+        """Best bid and ask price weighted by volume of the opposite side."""
+        bid_volume = self.bid_volume[:, 0]
+        ask_volume = self.ask_volume[:, 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (
+                self.bid_price[:, 0] * ask_volume + self.ask_price[:, 0] * bid_volume
+            ) / (bid_volume + ask_volume)
+
+    def imbalance(self, levels: int = 1) -> np.ndarray:
+        """(bid volume - ask volume) / (bid volume + ask volume) of first levels."""
+        bid_volume = self.bid_volume[:, :levels].sum(axis=1)
+        ask_volume = self.ask_volume[:, :levels].sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (bid_volume - ask_volume) / (bid_volume + ask_volume)
+
+
+class BidOfferHistory:
+    def __init__(self, capacity: int, slack: Optional[int] = None):
+        """Fixed capacity ring buffer of 10 levels bid offer updates.
+
+        The ring has capacity + slack rows. Each update is written twice, at
+        index i and i + capacity + slack, so the last n updates are always a
+        contiguous slice. Windows are views of the buffer without copy and
+        have at most capacity updates. Rows of a window are overwritten after
+        slack more updates, copy them to keep longer.
+
+        Parameters
+        ----------
+        capacity : int
+            maximum number of updates to keep.
+        slack : int, optional
+            number of updates that a window is valid after it is taken, by
+            default capacity.
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        if slack is None:
+            slack = capacity
+        if slack < 1:
+            raise ValueError(f"slack must be positive, got {slack}")
+
+        self.capacity = capacity
+        self.slack = slack
+        self._period = capacity + slack
+
+        size = 2 * self._period
+        self._timestamp = np.zeros(size, dtype=np.float64)
+        self._bid_price = np.zeros((size, N_LEVEL), dtype=np.float64)
+        self._bid_volume = np.zeros((size, N_LEVEL), dtype=np.float64)
+        self._ask_price = np.zeros((size, N_LEVEL), dtype=np.float64)
+        self._ask_volume = np.zeros((size, N_LEVEL), dtype=np.float64)
+
+        # total number of updates
+        self._count = 0
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of buffer arrays."""
+        return sum(
+            i.nbytes
+            for i in (
+                self._timestamp,
+                self._bid_price,
+                self._bid_volume,
+                self._ask_price,
+                self._ask_volume,
+            )
+        )
+
+    @property
+    def count(self) -> int:
+        """Total number of updates including overwritten updates."""
+        return self._count
+
+    def append(self, data: dict, timestamp: Optional[float] = None):
+        """Add bid offer data of RealtimeDataConnection.subscribe_bid_offer.
+
+        Parameters
+        ----------
+        data : dict
+            raw bid offer data.
+        timestamp : float, optional
+            received time in seconds since epoch, by default time.time().
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        bid_price = [data[i] for i in _BID_PRICE_KEYS]
+        bid_volume = [data[i] for i in _BID_VOLUME_KEYS]
+        ask_price = [data[i] for i in _ASK_PRICE_KEYS]
+        ask_volume = [data[i] for i in _ASK_VOLUME_KEYS]
+
+        with self._lock:
+            i = self._count % self._period
+            for j in (i, i + self._period):
+                self._timestamp[j] = timestamp
+                self._bid_price[j] = bid_price
+                self._bid_volume[j] = bid_volume
+                self._ask_price[j] = ask_price
+                self._ask_volume[j] = ask_volume
+            self._count += 1
+
+    def last(self, n: Optional[int] = None) -> BidOfferWindow:
+        """Last n updates, by default all updates in buffer."""
+        with self._lock:
+            length = len(self)
+            n = length if n is None else max(min(n, length), 0)
+            end = self._end()
+            return self._window(end - n, end)
+
+    def since(self, seconds: float, now: Optional[float] = None) -> BidOfferWindow:
+        """Updates in the last seconds.
+
+        Parameters
+        ----------
+        seconds : float
+            window length in seconds.
+        now : float, optional
+            end of window in seconds since epoch, by default time.time().
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            end = self._end()
+            start = end - len(self)
+            start += int(
+                np.searchsorted(self._timestamp[start:end], now - seconds, "left")
+            )
+            return self._window(start, end)
+
+    def clear(self):
+        """Remove all updates."""
+        with self._lock:
+            self._count = 0
+
+    def _end(self) -> int:
+        if self._count <= self._period:
+            return self._count
+        # the newest update is at (count - 1) % period + period
+        return (self._count - 1) % self._period + self._period + 1
+
+    def _window(self, start: int, end: int) -> BidOfferWindow:
+        return BidOfferWindow(
+            timestamp=self._timestamp[start:end],
+            bid_price=self._bid_price[start:end],
+            bid_volume=self._bid_volume[start:end],
+            ask_price=self._ask_price[start:end],
+            ask_volume=self._ask_volume[start:end],
+        )
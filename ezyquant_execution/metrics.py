@@ -0,0 +1,152 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Deque, Dict, Iterator, Optional, Tuple, TypeVar
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Name of timed phases
+ITERATION = "iteration"
+ON_TIMER = "on_timer"
+
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyRecorder:
+    def __init__(self, history: int = 10000, enabled: bool = False):
+        """Record latency of Settrade SDK calls, on_timer and iterations.
+
+        Keep the last history samples of each name and symbol. Recording is
+        skipped while disabled, so timing cost nothing by default.
+
+        Parameters
+        ----------
+        history : int, optional
+            number of recent samples to keep per name and symbol, by default 10000.
+        enabled : bool, optional
+            record samples, by default False.
+        """
+        self.history = history
+        self.enabled = enabled
+
+        self._samples: Dict[Tuple[str, Optional[str]], Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def record(self, name: str, seconds: float, symbol: Optional[str] = None):
+        """Add a sample of name and symbol."""
+        if not self.enabled:
+            return
+        key = (name, symbol)
+        samples = self._samples.get(key)
+        if samples is None:
+            with self._lock:
+                samples = self._samples.setdefault(key, deque(maxlen=self.history))
+        samples.append(seconds)
+
+    @contextmanager
+    def time(self, name: str, symbol: Optional[str] = None) -> Iterator[None]:
+        """Record time of with block."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, symbol)
+
+    def summary(self, by_symbol: bool = False) -> Dict[str, Dict[str, float]]:
+        """Count, mean, p50, p95, p99 and max seconds of each name.
+
+        If by_symbol, key is "name:symbol" for samples with symbol.
+        """
+        with self._lock:
+            items = list(self._samples.items())
+
+        grouped: Dict[str, list] = {}
+        for (name, symbol), samples in items:
+            key = f"{name}:{symbol}" if by_symbol and symbol is not None else name
+            grouped.setdefault(key, []).extend(samples)
+
+        out = {}
+        for key, samples in sorted(grouped.items()):
+            if not samples:
+                continue
+            arr = np.array(samples)
+            out[key] = {
+                "count": len(arr),
+                "mean": float(arr.mean()),
+                **{
+                    f"p{q}": float(v)
+                    for q, v in zip(PERCENTILES, np.percentile(arr, PERCENTILES))
+                },
+                "max": float(arr.max()),
+            }
+        return out
+
+    def reset(self):
+        """Remove all samples."""
+        with self._lock:
+            self._samples.clear()
+
+    def log_summary(self, level: int = logging.INFO):
+        """Log one line of p50/p95/p99 milliseconds per name."""
+        summary = self.summary()
+        if not summary:
+            return
+        text = " | ".join(
+            f"{k} n={v['count']} p50={v['p50'] * 1e3:.1f}"
+            f" p95={v['p95'] * 1e3:.1f} p99={v['p99'] * 1e3:.1f}ms"
+            for k, v in summary.items()
+        )
+        logger.log(level, f"Latency {text}")
+
+    def start_logging(self, interval: float = 60.0) -> threading.Event:
+        """Log summary every interval seconds on daemon thread.
+
+        Return event, set it to stop logging.
+        """
+        event = threading.Event()
+
+        def run():
+            while not event.wait(interval):
+                self.log_summary()
+
+        threading.Thread(target=run, daemon=True).start()
+        return event
+
+
+# Recorder of ExecuteContext, ExecuteDerivativeContext and executing functions
+recorder = LatencyRecorder()
+
+
+def timed(name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorator of context method that record latency to recorder.
+
+    Symbol is symbol attribute of the context if exist.
+    """
+
+    def decorator(function: Callable[..., T]) -> Callable[..., T]:
+        @wraps(function)
+        def wrapper(self, *args, **kwargs) -> T:
+            if not recorder.enabled:
+                return function(self, *args, **kwargs)
+            with recorder.time(name, getattr(self, "symbol", None)):
+                return function(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -1,88 +1,787 @@
-from threading import Event, Timer
-from typing import Callable, Dict, Optional
+import heapq
+import itertools
+import logging
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from threading import Condition, Event, Lock, Thread
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
 
 from settrade_v2.realtime import RealtimeDataConnection, Subscriber
 
+from . import config as cfg
 from .entity import BidOffer, PriceInfo
+from .history import BidOfferHistory
+from .metrics import recorder
+
+logger = logging.getLogger(__name__)
+
+S = TypeVar("S", bound="SettradeSubscriber")
+
+
+class StaleDataError(ConnectionError):
+    """Last realtime data is older than max age."""
 
 
 class SettradeSubscriber:
-    def __init__(self, function: Callable[..., Subscriber], *args, **kwargs):
+    def __init__(
+        self,
+        function: Callable[..., Subscriber],
+        *args,
+        is_wait: bool = True,
+        timeout: float = 30,
+        lifetime: float = 12 * 60 * 60,
+        is_renew: bool = False,
+        **kwargs,
+    ):
+        """Subscribe realtime data.
+
+        Parameters
+        ----------
+        function : Callable[..., Subscriber]
+            subscribe function of RealtimeDataConnection.
+        is_wait : bool, optional
+            wait for the first data before return, by default True. If False,
+            data wait for the first data instead.
+        timeout : float, optional
+            seconds after subscribe to wait for the first data, by default 30.
+        lifetime : float, optional
+            seconds after subscribe to stop, by default 12 hours.
+        is_renew : bool, optional
+            subscribe again instead of stop after lifetime, by default False.
+            Callbacks and listeners are kept.
+        """
         self.function = function
         self.args = args
         self.kwargs = kwargs
+        self.timeout = timeout
+        self.lifetime = lifetime
+        self.is_renew = is_renew
 
         self._data: dict = {}
         self._error: Optional[Exception] = None
 
+        # Number of received data and time of the last data
+        self.seq = 0
+        self.received_at: Optional[float] = None
+        self.received_monotonic: Optional[float] = None
+        # (raw data, parsed data) of the last parse
+        self._parsed: Tuple[dict, Any] = (self._data, None)
+
         self._event: Event = Event()
+        # Called on Settrade thread after each new data, must not block
+        self._callbacks: List[Callable[[], None]] = []
+        self._listeners: List[SubscriberListener] = []
 
-        self._subscriber = self.function(
-            on_message=self._on_message, *self.args, **self.kwargs
-        )
-        self._subscriber.start()
-        # Stop after 12 hours
-        timer = Timer(12 * 60 * 60, self._subscriber.stop)
-        timer.daemon = True
-        timer.start()
+        self._stopped = False
+        self._lock = Lock()
+        self._subscribed_at = time.monotonic()
+        self._subscriber = self._subscribe()
 
         # wait for first data to be received
-        if not self._event.wait(timeout=30):
+        if is_wait and not self.wait():
+            self.stop()
             raise ConnectionError("No data received yet")
 
+        _expiry.add(self, lifetime)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the first data. Return True if received.
+
+        If timeout is None, wait until timeout seconds after subscribe.
+        """
+        if timeout is None:
+            timeout = max(self._subscribed_at + self.timeout - time.monotonic(), 0)
+        return self._event.wait(timeout)
+
+    @property
+    def is_stopped(self) -> bool:
+        return self._stopped
+
+    def stop(self):
+        """Unsubscribe and stop listeners. Data raise ConnectionError after
+        stop. The connection of RealtimeDataConnection is kept."""
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            _stop_subscriber(self._subscriber)
+        _expiry.remove(self)
+        for i in self._listeners:
+            i.stop()
+
+    def renew(self):
+        """Subscribe again and keep data, callbacks and listeners."""
+        with self._lock:
+            if self._stopped:
+                return
+            old = self._subscriber
+            self._subscribed_at = time.monotonic()
+            # Start new subscription before stop, so the topic is never unsubscribed
+            self._subscriber = self._subscribe()
+            _stop_subscriber(old)
+        _expiry.remove(self)
+        _expiry.add(self, self.lifetime)
+
+    def _expire(self):
+        if self.is_renew:
+            self.renew()
+        else:
+            self.stop()
+
+    def _subscribe(self) -> Subscriber:
+        subscriber = self.function(
+            on_message=self._on_message, *self.args, **self.kwargs
+        )
+        subscriber.start()
+        return subscriber
+
+    @property
+    def age(self) -> float:
+        """Seconds since the last data. Infinity if no data received yet."""
+        if self.received_monotonic is None:
+            return float("inf")
+        return time.monotonic() - self.received_monotonic
+
     @property
-    def data(self) -> dict:
+    def data(self):
+        """Parsed data of the last message.
+
+        Message is parsed once on the first access after it arrive, then the
+        same object is returned until the next message.
+        """
+        return self.get_data()
+
+    def get_data(self, max_age: Optional[float] = None):
+        """Parsed data of the last message.
+
+        Parameters
+        ----------
+        max_age : float, optional
+            raise StaleDataError if the last data is older than max_age
+            seconds, by default no limit.
+        """
+        if not self._event.is_set() and not self.wait():
+            raise ConnectionError("No data received yet")
+        if self._stopped:
+            raise ConnectionError(f"{self.kwargs} subscriber is stopped")
         if self._error:
             raise self._error
-        return self._data
+        if max_age is not None and self.age > max_age:
+            raise StaleDataError(
+                f"{self.kwargs} data is {self.age:.1f}s old, max age is {max_age}s"
+            )
+
+        return self._get_parsed(self._data)
+
+    def register_callback(self, callback: Callable[[], None]):
+        """Call callback on Settrade thread after each new data.
+
+        callback must not block, use add_listener for slow functions.
+        """
+        self._callbacks = self._callbacks + [callback]
+
+    def unregister_callback(self, callback: Callable[[], None]) -> bool:
+        """Remove callback. Return False if callback is not registered."""
+        if callback not in self._callbacks:
+            return False
+        self._callbacks = [i for i in self._callbacks if i is not callback]
+        return True
+
+    def add_listener(
+        self, function: Callable[[Any], None], maxsize: int = 1
+    ) -> "SubscriberListener":
+        """Call function with parsed data of each new message on a listener
+        thread.
+
+        Messages are put in a bounded queue of the listener, so a slow function
+        never block the Settrade thread. If the queue is full, the oldest
+        message is dropped and counted in listener.dropped.
+
+        Parameters
+        ----------
+        function : Callable[[Any], None]
+            function that receive parsed data, such as BidOffer or PriceInfo.
+        maxsize : int, optional
+            maximum number of pending messages, by default 1 (latest only).
+
+        Returns
+        -------
+        SubscriberListener
+            listener with counters, pass to remove_listener to stop.
+        """
+        listener = SubscriberListener(function, self._get_parsed, maxsize=maxsize)
+        self._listeners = self._listeners + [listener]
+        return listener
+
+    def remove_listener(self, listener: "SubscriberListener"):
+        """Stop listener and remove it from subscriber."""
+        self._listeners = [i for i in self._listeners if i is not listener]
+        listener.stop()
+
+    def _get_parsed(self, raw: dict):
+        raw_parsed, parsed = self._parsed
+        if raw_parsed is not raw:
+            parsed = self._parse(raw)
+            # Keep cache of the latest message only
+            if raw is self._data:
+                self._parsed = (raw, parsed)
+        return parsed
+
+    def _parse(self, data: dict):
+        """Convert raw data of message, override in subclass."""
+        return data
+
+    def _on_data(self, data: dict):
+        """Called on Settrade thread with raw data of each new message before
+        callbacks, override in subclass."""
 
     def _on_message(self, message):
         self._event.set()
         if message["is_success"]:
             self._data = message["data"]
             self._error = None
+            self.received_at = time.time()
+            self.received_monotonic = time.monotonic()
+            self.seq += 1
+            self._on_data(self._data)
+            for i in self._callbacks:
+                i()
+            for i in self._listeners:
+                i.put(self._data)
         else:
             self._error = ConnectionError(message["message"])
             raise self._error
 
 
+def _stop_subscriber(subscriber: Subscriber):
+    """Remove callbacks of Settrade subscriber and keep the connection.
+
+    Subscriber.stop disconnect the connection of RealtimeDataConnection when
+    the last topic is unsubscribed. paho doesn't reconnect it and
+    RealtimeDataConnection keep the same CallBacker, so every later
+    subscription of the process would receive no data.
+    """
+    call_backer = subscriber._call_backer
+    for i in subscriber.callback_list:
+        call_backer.remove_callback(
+            callback_type=i.callback_type, topic=i.topic, callback=i.callback
+        )
+    subscriber.callback_list.clear()
+
+
+class SubscriberListener:
+    def __init__(
+        self,
+        function: Callable[[Any], None],
+        parse: Callable[[dict], Any],
+        maxsize: int = 1,
+    ):
+        """Call function with parsed data on a daemon thread.
+
+        Created by SettradeSubscriber.add_listener.
+
+        Attributes
+        ----------
+        received : int
+            number of messages put in queue.
+        dropped : int
+            number of messages dropped because the queue is full.
+        processed : int
+            number of function calls.
+        errors : int
+            number of function calls that raise exception.
+        lag : float
+            seconds from put to call of the last processed message.
+        max_lag : float
+            maximum lag.
+        """
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be positive, got {maxsize}")
+
+        self.function = function
+        self.parse = parse
+        self.maxsize = maxsize
+
+        self.received = 0
+        self.dropped = 0
+        self.processed = 0
+        self.errors = 0
+        self.lag = 0.0
+        self.max_lag = 0.0
+
+        self._queue: Deque[Tuple[float, dict]] = deque()
+        self._condition = Condition()
+        self._stopped = False
+
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        """Number of messages in queue."""
+        return len(self._queue)
+
+    def put(self, data: dict):
+        """Add raw data to queue. Never block."""
+        with self._condition:
+            if self._stopped:
+                return
+            if len(self._queue) >= self.maxsize:
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append((time.monotonic(), data))
+            self.received += 1
+            self._condition.notify()
+
+    def stop(self):
+        """Stop thread after the current call. Pending messages are dropped."""
+        with self._condition:
+            self._stopped = True
+            self._queue.clear()
+            self._condition.notify()
+
+    def join(self, timeout: Optional[float] = None):
+        """Wait until listener thread exit."""
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                put_at, data = self._queue.popleft()
+
+            self.lag = time.monotonic() - put_at
+            self.max_lag = max(self.max_lag, self.lag)
+            try:
+                self.function(self.parse(data))
+            except Exception:
+                self.errors += 1
+                logger.exception(f"Listener {self.function} error")
+            self.processed += 1
+
+
 class BidOfferSubscriber(SettradeSubscriber):
-    def __init__(self, symbol: str, rt_conn: RealtimeDataConnection):
-        super().__init__(rt_conn.subscribe_bid_offer, symbol=symbol)
+    def __init__(
+        self,
+        symbol: str,
+        rt_conn: RealtimeDataConnection,
+        is_wait: bool = True,
+        history: Optional[int] = None,
+        is_renew: bool = False,
+    ):
+        """Subscribe bid offer of symbol.
+
+        Parameters
+        ----------
+        history : int, optional
+            number of updates to keep in history, by default
+            SETTRADE_BID_OFFER_HISTORY. 0 to disable history.
+        is_renew : bool, optional
+            subscribe again instead of stop after lifetime, by default False.
+        """
+        if history is None:
+            history = cfg.SETTRADE_BID_OFFER_HISTORY
+        self.history: Optional[BidOfferHistory] = (
+            BidOfferHistory(history) if history else None
+        )
+        super().__init__(
+            rt_conn.subscribe_bid_offer,
+            symbol=symbol,
+            is_wait=is_wait,
+            is_renew=is_renew,
+        )
 
     @property
     def data(self) -> BidOffer:
-        return BidOffer.from_dict(super().data)
+        return super().data
+
+    def get_data(self, max_age: Optional[float] = None) -> BidOffer:
+        return super().get_data(max_age)
+
+    def _parse(self, data: dict) -> BidOffer:
+        return BidOffer.from_dict(data)
+
+    def _on_data(self, data: dict):
+        if self.history is not None:
+            self.history.append(data)
 
 
 class PriceInfoSubscriber(SettradeSubscriber):
-    def __init__(self, symbol: str, rt_conn: RealtimeDataConnection):
-        super().__init__(rt_conn.subscribe_price_info, symbol=symbol)
+    def __init__(
+        self,
+        symbol: str,
+        rt_conn: RealtimeDataConnection,
+        is_wait: bool = True,
+        is_renew: bool = False,
+    ):
+        super().__init__(
+            rt_conn.subscribe_price_info,
+            symbol=symbol,
+            is_wait=is_wait,
+            is_renew=is_renew,
+        )
 
     @property
     def data(self) -> PriceInfo:
-        return PriceInfo.from_camel_dict(super().data)
+        return super().data
+
+    def get_data(self, max_age: Optional[float] = None) -> PriceInfo:
+        return super().get_data(max_age)
+
+    def _parse(self, data: dict) -> PriceInfo:
+        return PriceInfo.from_camel_dict(data)
 
 
 """
-Cache function
+Subscription manager
 """
 
-bo_sub_dict: Dict[str, BidOfferSubscriber] = {}
-pi_sub_dict: Dict[str, PriceInfoSubscriber] = {}
+
+class _Expiry:
+    def __init__(
+        self, clock: Callable[[], float] = time.monotonic, is_thread: bool = True
+    ):
+        """Stop or renew subscribers at their expire time.
+
+        Parameters
+        ----------
+        clock : Callable[[], float], optional
+            current time in seconds, by default time.monotonic.
+        is_thread : bool, optional
+            expire on one daemon thread, by default True. If False, call
+            expire_due instead.
+        """
+        self.clock = clock
+        self.is_thread = is_thread
+
+        self._heap: List[Tuple[float, int, "weakref.ref[SettradeSubscriber]"]] = []
+        self._counter = itertools.count()
+        self._condition = Condition()
+        self._thread: Optional[Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def add(self, subscriber: "SettradeSubscriber", delay: float):
+        """Expire subscriber after delay seconds."""
+        with self._condition:
+            expire_at = self.clock() + delay
+            item = (expire_at, next(self._counter), weakref.ref(subscriber))
+            heapq.heappush(self._heap, item)
+            if self.is_thread and self._thread is None:
+                self._thread = Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def remove(self, subscriber: "SettradeSubscriber"):
+        """Don't expire subscriber. Garbage collected subscribers are also
+        removed."""
+        with self._condition:
+            heap = [i for i in self._heap if i[2]() not in (None, subscriber)]
+            if len(heap) != len(self._heap):
+                heapq.heapify(heap)
+                self._heap = heap
+
+    def expire_due(self) -> int:
+        """Expire subscribers whose expire time has passed. Return number of
+        expired subscribers."""
+        ref_list = []
+        with self._condition:
+            now = self.clock()
+            while self._heap and self._heap[0][0] <= now:
+                ref_list.append(heapq.heappop(self._heap)[2])
+
+        n = 0
+        for ref in ref_list:
+            subscriber = ref()
+            if subscriber is None:
+                continue
+            try:
+                subscriber._expire()
+            except Exception:
+                logger.exception("Expire subscriber error")
+            n += 1
+        return n
+
+    def _run(self):
+        while True:
+            with self._condition:
+                timeout = None
+                if self._heap:
+                    timeout = self._heap[0][0] - self.clock()
+                if timeout is None or timeout > 0:
+                    self._condition.wait(timeout)
+                    continue
+            self.expire_due()
+
+
+_expiry = _Expiry()
+
+
+class SubscriptionManager(Generic[S]):
+    def __init__(
+        self,
+        subscriber: Callable[..., S],
+        name: str,
+        max_size: Optional[int] = None,
+    ):
+        """Subscribe each symbol once and unsubscribe unused symbols.
+
+        Symbols are kept in least recently used order. If there are more
+        than max_size symbols, the least recently used symbols that are not
+        acquired are unsubscribed. Subscribers are renewed in place after
+        their lifetime, so callbacks and listeners keep receiving data.
+        Subscribers that are stopped by user are subscribed again on the
+        next get.
+
+        Parameters
+        ----------
+        subscriber : Callable[..., S]
+            subscriber class such as BidOfferSubscriber.
+        name : str
+            name of subscribe latency in metrics recorder.
+        max_size : int, optional
+            maximum number of symbols, by default no limit.
+        """
+        self.subscriber = subscriber
+        self.name = name
+        self.max_size = max_size
+
+        self._subs: "OrderedDict[str, S]" = OrderedDict()
+        self._refcount: Dict[str, int] = {}
+        self._lock = Lock()
+        # Subscribe each symbol once when many threads (accounts) subscribe together
+        self._key_locks: Dict[str, Lock] = {}
+
+    def __len__(self) -> int:
+        return len(self._subs)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._subs
+
+    @property
+    def symbols(self) -> List[str]:
+        """Subscribed symbols from least recently used."""
+        return list(self._subs)
+
+    def get(
+        self, symbol: str, rt_conn: RealtimeDataConnection, is_wait: bool = True
+    ) -> S:
+        """Return subscriber of symbol, subscribe if not subscribed."""
+        sub = self._subs.get(symbol)
+        if sub is None or sub.is_stopped:
+            sub = self._subscribe(symbol, rt_conn, is_wait)
+        elif self.max_size is not None:
+            with self._lock:
+                if symbol in self._subs:
+                    self._subs.move_to_end(symbol)
+        return sub
+
+    def acquire(
+        self,
+        symbol: str,
+        rt_conn: Optional[RealtimeDataConnection] = None,
+        is_wait: bool = True,
+    ) -> Optional[S]:
+        """Don't unsubscribe symbol by max_size until release.
+
+        If rt_conn is given, return subscriber of symbol after it is
+        acquired, subscribe if not subscribed.
+        """
+        with self._lock:
+            self._refcount[symbol] = self._refcount.get(symbol, 0) + 1
+        if rt_conn is None:
+            return None
+        try:
+            return self.get(symbol, rt_conn, is_wait)
+        except Exception:
+            self.release(symbol)
+            raise
+
+    def release(self, symbol: str):
+        """Release symbol that is acquired."""
+        with self._lock:
+            n = self._refcount.get(symbol, 0) - 1
+            if n > 0:
+                self._refcount[symbol] = n
+            else:
+                self._refcount.pop(symbol, None)
+            evicted = self._evict()
+        for i in evicted:
+            i.stop()
+
+    def unsubscribe(self, symbol: str) -> bool:
+        """Unsubscribe symbol. Return False if symbol is not subscribed."""
+        with self._lock:
+            sub = self._subs.pop(symbol, None)
+            self._key_locks.pop(symbol, None)
+        if sub is None:
+            return False
+        sub.stop()
+        return True
+
+    def clear(self):
+        """Unsubscribe all symbols."""
+        for i in self.symbols:
+            self.unsubscribe(i)
+
+    def stats(self) -> Dict[str, int]:
+        """Number of subscriptions, acquired symbols, listeners and bytes of
+        history."""
+        with self._lock:
+            evicted = self._evict()
+            subs = list(self._subs.values())
+            acquired = sum(i in self._subs for i in self._refcount)
+        for i in evicted:
+            i.stop()
+
+        history = [getattr(i, "history", None) for i in subs]
+        return {
+            "subscriptions": len(subs),
+            "acquired": acquired,
+            "listeners": sum(len(i._listeners) for i in subs),
+            "history_bytes": sum(i.nbytes for i in history if i is not None),
+        }
+
+    def _subscribe(
+        self, symbol: str, rt_conn: RealtimeDataConnection, is_wait: bool
+    ) -> S:
+        with self._lock:
+            key_lock = self._key_locks.setdefault(symbol, Lock())
+        with key_lock:
+            sub = self._subs.get(symbol)
+            if sub is not None and not sub.is_stopped:
+                return sub
+
+            with recorder.time(self.name, symbol):
+                sub = self.subscriber(
+                    symbol=symbol, rt_conn=rt_conn, is_wait=is_wait, is_renew=True
+                )
+            with self._lock:
+                self._subs[symbol] = sub
+                self._subs.move_to_end(symbol)
+                evicted = self._evict()
+        for i in evicted:
+            i.stop()
+        return sub
+
+    def _evict(self) -> List[S]:
+        """Remove stopped subscribers and least recently used subscribers
+        over max_size. Must hold lock, return subscribers to stop."""
+        for k in [k for k, v in self._subs.items() if v.is_stopped]:
+            del self._subs[k]
+
+        evicted = []
+        if self.max_size is not None:
+            n = len(self._subs) - self.max_size
+            for k in list(self._subs):
+                if n <= 0:
+                    break
+                if k not in self._refcount:
+                    evicted.append(self._subs.pop(k))
+                    self._key_locks.pop(k, None)
+                    n -= 1
+        return evicted
+
+
+bo_sub_manager = SubscriptionManager(
+    BidOfferSubscriber,
+    name="subscribe_bid_offer",
+    max_size=cfg.SETTRADE_MAX_SUBSCRIPTIONS or None,
+)
+pi_sub_manager = SubscriptionManager(
+    PriceInfoSubscriber,
+    name="subscribe_price_info",
+    max_size=cfg.SETTRADE_MAX_SUBSCRIPTIONS or None,
+)
 
 
 def BidOfferSubscriberCache(
     symbol: str, rt_conn: RealtimeDataConnection
 ) -> BidOfferSubscriber:
-    if symbol not in bo_sub_dict:
-        bo_sub_dict[symbol] = BidOfferSubscriber(symbol=symbol, rt_conn=rt_conn)
-    return bo_sub_dict[symbol]
+    return bo_sub_manager.get(symbol, rt_conn)
 
 
 def PriceInfoSubscriberCache(
     symbol: str, rt_conn: RealtimeDataConnection
 ) -> PriceInfoSubscriber:
-    if symbol not in pi_sub_dict:
-        pi_sub_dict[symbol] = PriceInfoSubscriber(symbol=symbol, rt_conn=rt_conn)
-    return pi_sub_dict[symbol]
+    return pi_sub_manager.get(symbol, rt_conn)
+
+
+def subscription_stats() -> Dict[str, Any]:
+    """Resource usage of realtime subscriptions of this process."""
+    return {
+        "bid_offer": bo_sub_manager.stats(),
+        "price_info": pi_sub_manager.stats(),
+        "expiry": len(_expiry),
+        "threads": threading.active_count(),
+        "max_rss": _max_rss(),
+    }
+
+
+def _max_rss() -> Optional[int]:
+    """Peak resident memory in bytes, None if not available."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def subscribe_many(
+    symbols: Iterable[str],
+    rt_conn: RealtimeDataConnection,
+    is_bid_offer: bool = True,
+    is_price_info: bool = False,
+    timeout: float = 30,
+) -> List[str]:
+    """Subscribe many symbols at once.
+
+    Send every subscription without waiting, then wait for the first data of
+    all symbols until one deadline, instead of one wait per symbol.
+    Subscribers are stored in bo_sub_manager and pi_sub_manager and shared
+    with contexts. Every subscription
+    use the same broker connection of rt_conn.
+
+    Returns
+    -------
+    List[str]
+        symbols that don't receive the first data within timeout. Their data
+        raise ConnectionError until the first data is received.
+    """
+    deadline = time.monotonic() + timeout
+    symbols = list(dict.fromkeys(symbols))
+
+    sub_list = []
+    for symbol in symbols:
+        if is_bid_offer:
+            sub = bo_sub_manager.get(symbol, rt_conn, is_wait=False)
+            sub_list.append((symbol, sub))
+        if is_price_info:
+            sub = pi_sub_manager.get(symbol, rt_conn, is_wait=False)
+            sub_list.append((symbol, sub))
+
+    failed = []
+    for symbol, sub in sub_list:
+        if not sub.wait(max(deadline - time.monotonic(), 0)) and symbol not in failed:
+            failed.append(symbol)
+    return failed
@@ -0,0 +1,341 @@
+import heapq
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime
+from datetime import time as dt_time
+from datetime import timedelta
+from typing import Callable, Deque, Dict, List, Literal, Optional, Tuple
+
+from . import constant as c
+from .entity import (
+    MARKET_STATUS_DICT,
+    MARKET_STATUS_DISPLAY_CLOSE,
+    MARKET_STATUS_DISPLAY_INTERMISSION1,
+    MARKET_STATUS_DISPLAY_OFF_HOUR,
+    MARKET_STATUS_DISPLAY_OPEN1,
+    MARKET_STATUS_DISPLAY_OPEN2,
+    MARKET_STATUS_DISPLAY_PRE_CLOSE,
+    MARKET_STATUS_DISPLAY_PRE_OPEN1,
+    MARKET_STATUS_DISPLAY_PRE_OPEN2,
+)
+
+logger = logging.getLogger(__name__)
+
+OVERRUN_TYPE = Literal["skip", "catch_up", "coalesce"]
+
+
+class Scheduler(ABC):
+    """Decide when execute_on_timer run each iteration.
+
+    execute_on_timer call `start` once, then wait `next_timeout` seconds
+    and call `tick` until the end. Iteration is executed only if `tick`
+    return True. Subclass must implement `next_timeout` and `tick`.
+    """
+
+    def start(self):
+        """Start scheduler. Called once before the first iteration."""
+
+    @abstractmethod
+    def next_timeout(self) -> float:
+        """Seconds to wait before the next call of tick."""
+
+    @abstractmethod
+    def tick(self) -> bool:
+        """Return True if iteration should be executed now."""
+
+
+class IntervalScheduler(Scheduler):
+    def __init__(self, interval: float):
+        """Wait interval seconds after each iteration.
+
+        The period is interval plus iteration time. This is the default
+        scheduler of execute_on_timer.
+
+        Parameters
+        ----------
+        interval : float
+            seconds to sleep between each iteration.
+        """
+        self.interval = interval
+
+    def next_timeout(self) -> float:
+        return self.interval
+
+    def tick(self) -> bool:
+        return True
+
+
+class FixedRateScheduler(Scheduler):
+    def __init__(
+        self,
+        interval: float,
+        overrun: OVERRUN_TYPE = "skip",
+        align: bool = True,
+        history: int = 1000,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        """Run iteration every interval seconds on monotonic clock.
+
+        Iteration time doesn't shift the next tick, so a 10 seconds strategy
+        run every 10 seconds. Lateness of each tick (seconds between scheduled
+        time and actual time) is recorded in `lateness`.
+
+        Parameters
+        ----------
+        interval : float
+            seconds between each tick.
+        overrun : Literal["skip", "catch_up", "coalesce"], optional
+            what to do if iteration take longer than interval, by default "skip".
+                - skip: drop ticks that are late more than interval and wait for the next tick.
+                - catch_up: run every missed tick back to back until on schedule.
+                - coalesce: run one iteration for all missed ticks then wait for the next tick.
+        align : bool, optional
+            align ticks to wall clock boundaries, for example every 10 seconds
+            at :00, :10, :20. by default True.
+        history : int, optional
+            number of recent lateness to keep, by default 1000.
+        clock : Callable[[], float], optional
+            monotonic clock, by default time.monotonic
+        wall_clock : Callable[[], float], optional
+            wall clock for align, by default time.time
+        """
+        if interval <= 0:
+            raise ValueError(f"interval must be positive, got {interval}")
+        if overrun not in ("skip", "catch_up", "coalesce"):
+            raise ValueError(f"Invalid overrun {overrun}")
+
+        self.interval = interval
+        self.overrun = overrun
+        self.align = align
+        self.clock = clock
+        self.wall_clock = wall_clock
+
+        self.lateness: Deque[float] = deque(maxlen=history)
+        self.tick_count = 0
+        # ticks that are skipped or coalesced
+        self.missed_count = 0
+
+        self._next_tick: Optional[float] = None
+
+    @property
+    def max_lateness(self) -> float:
+        """Maximum lateness in history."""
+        return max(self.lateness, default=0.0)
+
+    @property
+    def mean_lateness(self) -> float:
+        """Mean lateness in history."""
+        return sum(self.lateness) / len(self.lateness) if self.lateness else 0.0
+
+    def start(self):
+        delay = self.interval
+        if self.align:
+            delay -= self.wall_clock() % self.interval
+        self._next_tick = self.clock() + delay
+
+    def next_timeout(self) -> float:
+        if self._next_tick is None:
+            self.start()
+        return max(self._next_tick - self.clock(), 0.0)  # type: ignore
+
+    def tick(self) -> bool:
+        if self._next_tick is None:
+            self.start()
+
+        now = self.clock()
+        lateness = now - self._next_tick  # type: ignore
+        if lateness < 0:
+            # wake up before schedule
+            return False
+
+        missed = int(lateness // self.interval)
+        if self.overrun == "catch_up":
+            self._next_tick += self.interval  # type: ignore
+        else:
+            # skip or coalesce missed ticks and stay on schedule
+            self._next_tick += (missed + 1) * self.interval  # type: ignore
+            if missed:
+                self.missed_count += missed
+                logger.warning(
+                    f"Tick is late {lateness:.3f}s, {self.overrun} {missed} tick(s)"
+                )
+                if self.overrun == "skip":
+                    return False
+
+        self.tick_count += 1
+        self.lateness.append(lateness)
+        return True
+
+
+# Start time and session of trading calendar in constant.py
+SESSION_CALENDAR: List[Tuple[dt_time, str]] = [
+    (c.pre_open_session_1_start, MARKET_STATUS_DISPLAY_PRE_OPEN1),
+    (c.trading_session_1_start, MARKET_STATUS_DISPLAY_OPEN1),
+    (c.intermission_start, MARKET_STATUS_DISPLAY_INTERMISSION1),
+    (c.pre_open_session_2_start, MARKET_STATUS_DISPLAY_PRE_OPEN2),
+    (c.trading_session_2_start, MARKET_STATUS_DISPLAY_OPEN2),
+    (c.pre_close_start, MARKET_STATUS_DISPLAY_PRE_CLOSE),
+    (c.off_hour_start, MARKET_STATUS_DISPLAY_OFF_HOUR),
+    (c.market_close, MARKET_STATUS_DISPLAY_CLOSE),
+]
+
+
+class SessionScheduler(Scheduler):
+    def __init__(
+        self,
+        intervals: Dict[str, Optional[float]],
+        market_status: Optional[Callable[[], str]] = None,
+        status_interval: float = 1.0,
+        now: Callable[[], datetime] = datetime.now,
+    ):
+        """Run iteration with interval of current trading session and pause
+        in other sessions.
+
+        Session is from trading calendar in constant.py. If market_status is
+        given, session is from market status instead, so circuit breaker and
+        halt are paused too.
+
+        Example
+        -------
+        >>> scheduler = SessionScheduler({"Open1": 1.0, "Open2": 1.0, "Pre-Open1": 30.0})
+
+        Parameters
+        ----------
+        intervals : Dict[str, Optional[float]]
+            market status display (Pre-Open1, Open1, Intermission1, Pre-Open2,
+            Open2, Pre-Close, OffHour, Close, Circuit Breaker, Full Halt, ...)
+            as key and seconds between each iteration as value. None or
+            missing session is paused.
+        market_status : Callable[[], str], optional
+            function that return market status, for example
+            `lambda: ctx.market_status` of realtime price info. Can be market
+            status (OPEN1_E) or market status display (Open1). If it raise
+            exception, use trading calendar.
+        status_interval : float, optional
+            seconds to check market_status while paused, by default 1.0.
+        now : Callable[[], datetime], optional
+            current datetime, by default datetime.now
+        """
+        self.intervals = intervals
+        self.market_status = market_status
+        self.status_interval = status_interval
+        self.now = now
+
+        self.session: Optional[str] = None
+
+    def next_timeout(self) -> float:
+        now = self.now()
+        interval = self.intervals.get(self._get_session(now))
+        if interval is not None:
+            return interval
+
+        # paused, wait until next session
+        timeout = _seconds_until_next_session(now)
+        if self.market_status is not None:
+            timeout = min(timeout, self.status_interval)
+        return timeout
+
+    def tick(self) -> bool:
+        return self.intervals.get(self._get_session(self.now())) is not None
+
+    def _get_session(self, now: datetime) -> str:
+        session = None
+        if self.market_status is not None:
+            try:
+                status = self.market_status()
+                session = MARKET_STATUS_DICT.get(status, status)
+            except Exception as e:
+                logger.warning(f"Use trading calendar, market status error: {e}")
+
+        if session is None:
+            session = calendar_session(now)
+
+        if session != self.session:
+            logger.info(f"Session changed from {self.session} to {session}")
+            self.session = session
+        return session
+
+
+def calendar_session(now: datetime) -> str:
+    """Trading session of now from trading calendar in constant.py."""
+    out = MARKET_STATUS_DISPLAY_CLOSE
+    for start, session in SESSION_CALENDAR:
+        if now.time() < start:
+            break
+        out = session
+    return out
+
+
+def _seconds_until_next_session(now: datetime) -> float:
+    for start, _ in SESSION_CALENDAR:
+        if now.time() < start:
+            return (datetime.combine(now.date(), start) - now).total_seconds()
+    # first session of tomorrow
+    start = datetime.combine(now.date() + timedelta(days=1), SESSION_CALENDAR[0][0])
+    return (start - now).total_seconds()
+
+
+class SymbolScheduler:
+    def __init__(
+        self,
+        intervals: Dict[str, float],
+        priorities: Optional[Dict[str, int]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Heap of symbols ordered by time of the next run.
+
+        Every symbol is due at start. After a symbol is done, it is due
+        again interval seconds after its previous due time, or now if it is
+        already late.
+
+        Parameters
+        ----------
+        intervals : Dict[str, float]
+            symbol as key and seconds between each run of the symbol as value.
+        priorities : Dict[str, int], optional
+            symbol as key and priority as value. If more symbols are due than
+            available workers, lower priority run first. Missing symbol is 0.
+        clock : Callable[[], float], optional
+            monotonic clock, by default time.monotonic
+        """
+        self.intervals = intervals
+        self.priorities = priorities or {}
+        self.clock = clock
+
+        now = self.clock()
+        self._heap: List[Tuple[float, int, str]] = [
+            (now, self.priorities.get(k, 0), k) for k in intervals
+        ]
+        heapq.heapify(self._heap)
+        # symbol that is popped -> due time
+        self._running: Dict[str, float] = {}
+
+    def next_timeout(self) -> Optional[float]:
+        """Seconds until the next symbol is due. None if no symbol in heap."""
+        if not self._heap:
+            return None
+        return max(self._heap[0][0] - self.clock(), 0.0)
+
+    def pop_due(self, n: Optional[int] = None) -> List[str]:
+        """Pop at most n symbols that are due, lower priority first."""
+        now = self.clock()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap))
+        due.sort(key=lambda x: (x[1], x[0]))
+
+        out = due[:n]
+        for i in due[len(out) :]:
+            heapq.heappush(self._heap, i)
+        for due_at, _, symbol in out:
+            self._running[symbol] = due_at
+        return [i[2] for i in out]
+
+    def push(self, symbol: str):
+        """Schedule the next run of symbol that is popped."""
+        due_at = self._running.pop(symbol) + self.intervals[symbol]
+        due_at = max(due_at, self.clock())
+        heapq.heappush(self._heap, (due_at, self.priorities.get(symbol, 0), symbol))
@@ -2,13 +2,27 @@ import asyncio
 import contextlib
 import math
 import re
+from concurrent.futures import Executor, ThreadPoolExecutor, wait
 from datetime import datetime, time
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from threading import Event
-from typing import Optional
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import numpy as np
 
+T = TypeVar("T")
+
 """
 Time
 """
@@ -67,6 +81,79 @@ async def async_event_wait(event: asyncio.Event, timeout: Optional[float]):
     return event.is_set()
 
 
+"""
+Concurrent
+"""
+
+
+def run_parallel(
+    functions: Iterable[Callable[[], T]], executor: Optional[Executor] = None
+) -> List[T]:
+    """Call functions in parallel and return results in the same order.
+
+    Wait until all functions are done and raise the first exception.
+    If executor is None, create thread pool with one thread per function.
+    """
+    functions = list(functions)
+    if not functions:
+        return []
+
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=len(functions)) as executor:
+            return run_parallel(functions, executor)
+
+    futures = [executor.submit(i) for i in functions]
+    wait(futures)
+    return [i.result() for i in futures]
+
+
+async def async_run_parallel(
+    functions: Iterable[Callable[[], T]], executor: Optional[Executor] = None
+) -> List[T]:
+    """Same as run_parallel but for asyncio.
+
+    If executor is None, use default executor of the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(*[loop.run_in_executor(executor, i) for i in functions])
+
+
+async def async_gather_dict(
+    functions: Dict[str, Callable[[], Awaitable[T]]],
+    max_concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> Dict[str, Union[T, Exception]]:
+    """Await coroutine functions concurrently and return result of each key.
+
+    Exception of a function (asyncio.TimeoutError if timeout) is returned as
+    result of its key and doesn't affect other functions.
+
+    Parameters
+    ----------
+    functions : Dict[str, Callable[[], Awaitable[T]]]
+        key and coroutine function.
+    max_concurrency : int, optional
+        maximum number of functions running at the same time, by default no limit.
+    timeout : float, optional
+        seconds for each function after it start, by default no timeout.
+        Timeout only cancels the coroutine, a blocking call that it awaits in
+        an executor keeps running until it returns.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+    async def run(function: Callable[[], Awaitable[T]]) -> Union[T, Exception]:
+        try:
+            if semaphore is None:
+                return await asyncio.wait_for(function(), timeout)
+            async with semaphore:
+                return await asyncio.wait_for(function(), timeout)
+        except Exception as e:
+            return e
+
+    results = await asyncio.gather(*[run(i) for i in functions.values()])
+    return dict(zip(functions, results))
+
+
 """
 Round
 """
@@ -212,6 +299,50 @@ String
 """
 
 
+@lru_cache(maxsize=None)
 def camel_to_snake(name):
     name = re.sub("(.)([A-Z][a-z]+)", r"\1_\2", name)
     return re.sub("([a-z0-9])([A-Z])", r"\1_\2", name).lower()
+
+
+"""
+Collection
+"""
+
+
+def chunked(l: Sequence[T], size: int) -> List[Sequence[T]]:
+    """Split sequence into chunks of size. The last chunk may be smaller."""
+    if size < 1:
+        raise ValueError(f"size must be positive, got {size}")
+    return [l[i : i + size] for i in range(0, len(l), size)]
+
+
+def split_dict(d: Dict[str, T], n: int) -> List[Dict[str, T]]:
+    """Split dictionary into n dictionaries in round robin order."""
+    out: List[Dict[str, T]] = [{} for _ in range(n)]
+    for i, (k, v) in enumerate(d.items()):
+        out[i % n][k] = v
+    return out
+
+
+def index_by_symbol(l: Iterable[T]) -> Dict[str, T]:
+    """Map symbol to the first item of the symbol."""
+    out: Dict[str, T] = {}
+    for i in l:
+        out.setdefault(i.symbol, i)  # type: ignore
+    return out
+
+
+class SymbolTuple(tuple):
+    """Tuple of items that have symbol attribute.
+
+    Items are grouped by symbol once on first access of by_symbol.
+    """
+
+    @cached_property
+    def by_symbol(self) -> Dict[str, Tuple]:
+        """Symbol as key and tuple of items as value."""
+        out: Dict[str, list] = {}
+        for i in self:
+            out.setdefault(i.symbol, []).append(i)
+        return {k: tuple(v) for k, v in out.items()}
@@ -0,0 +1,53 @@
+from unittest.mock import ANY, Mock
+
+import pytest
+
+from ezyquant_execution.async_context import (
+    AsyncExecuteContext,
+    AsyncExecuteContextSymbol,
+)
+from ezyquant_execution.context import ExecuteContextSymbol
+
+SYMBOL = "AOT"
+
+
+@pytest.fixture
+def ctx():
+    return AsyncExecuteContextSymbol(
+        settrade_user=ANY, account_no=ANY, symbol=SYMBOL, signal=1
+    )
+
+
+def test_attribute(ctx: AsyncExecuteContextSymbol):
+    assert ctx.symbol == SYMBOL
+    assert ctx.signal == 1
+    assert ctx.sync == ExecuteContextSymbol(
+        settrade_user=ANY, account_no=ANY, symbol=SYMBOL, signal=1
+    )
+
+
+@pytest.mark.asyncio
+async def test_property(ctx: AsyncExecuteContextSymbol):
+    ctx.sync._get_account_info = Mock(return_value=Mock(line_available=100.0))
+
+    assert await ctx.line_available() == 100.0
+
+
+@pytest.mark.asyncio
+async def test_method(ctx: AsyncExecuteContextSymbol):
+    ctx.sync.place_order = Mock(return_value="order")
+
+    result = await ctx.buy(volume=100, price=1.0)
+
+    assert result == "order"
+    ctx.sync.place_order.assert_called_once_with(side="Buy", volume=100, price=1.0)
+
+
+def test_symbol():
+    ctx = AsyncExecuteContext(settrade_user=ANY, account_no=ANY)
+
+    result = ctx.Symbol(SYMBOL)
+
+    assert isinstance(result, AsyncExecuteContextSymbol)
+    assert result.sync is ctx.sync.Symbol(SYMBOL)
+    assert ctx.Symbol(SYMBOL) is result
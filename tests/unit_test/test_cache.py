@@ -0,0 +1,191 @@
+from unittest.mock import ANY, Mock
+
+import pytest
+
+from ezyquant_execution.cache import (
+    ACCOUNT_INFO,
+    ORDERS,
+    PORTFOLIOS,
+    QUOTE_SYMBOL,
+    TRADES,
+    AccountSnapshot,
+    ResponseCache,
+    on_token_refresh,
+    watch_token_refresh,
+)
+from ezyquant_execution.context import ExecuteContextSymbol
+
+
+class TestAccountSnapshot:
+    def test_get(self):
+        snapshot = AccountSnapshot()
+        fetch = Mock(return_value=1)
+
+        assert snapshot.get(ACCOUNT_INFO, fetch) == 1
+        assert snapshot.get(ACCOUNT_INFO, fetch) == 1
+
+        fetch.assert_called_once()
+
+    def test_invalidate(self):
+        snapshot = AccountSnapshot()
+        fetch_account_info = Mock(side_effect=[1, 2])
+        fetch_orders = Mock(return_value=())
+
+        snapshot.get(ACCOUNT_INFO, fetch_account_info)
+        snapshot.get(ORDERS, fetch_orders)
+        snapshot.invalidate(ACCOUNT_INFO)
+
+        assert snapshot.get(ACCOUNT_INFO, fetch_account_info) == 2
+        snapshot.get(ORDERS, fetch_orders)
+        fetch_orders.assert_called_once()
+
+    def test_clear(self):
+        snapshot = AccountSnapshot()
+        fetch = Mock(side_effect=[1, 2])
+
+        snapshot.get(ACCOUNT_INFO, fetch)
+        snapshot.clear()
+
+        assert snapshot.get(ACCOUNT_INFO, fetch) == 2
+
+    def test_clear_quotes(self):
+        snapshot = AccountSnapshot()
+        snapshot.quotes["AOT"] = 1
+
+        snapshot.clear()
+
+        assert snapshot.quotes == {}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestResponseCache:
+    def test_ttl(self):
+        clock = FakeClock()
+        cache = ResponseCache(ttl=1.0, clock=clock)
+        fetch = Mock(side_effect=[1, 2])
+
+        assert cache.get(ACCOUNT_INFO, fetch) == 1
+        clock.now = 0.5
+        assert cache.get(ACCOUNT_INFO, fetch) == 1
+        clock.now = 1.0
+        assert cache.get(ACCOUNT_INFO, fetch) == 2
+
+        assert cache.hits[ACCOUNT_INFO] == 1
+        assert cache.misses[ACCOUNT_INFO] == 2
+
+    def test_ttl_dict(self):
+        cache = ResponseCache(ttl={ACCOUNT_INFO: None}, clock=FakeClock())
+        fetch = Mock(return_value=1)
+
+        cache.get(ACCOUNT_INFO, fetch)
+        cache.get(ACCOUNT_INFO, fetch)
+        cache.get(TRADES, fetch)
+        cache.get(TRADES, fetch)
+
+        assert fetch.call_count == 3
+        assert cache.hit_count == 1
+        assert cache.miss_count == 3
+
+    def test_quote_ttl(self):
+        clock = FakeClock()
+        cache = ResponseCache(ttl=None, clock=clock, quote_ttl=1.0)
+        fetch = Mock(side_effect=[1, 2, 3])
+
+        assert cache.get_quote("AOT", fetch) == 1
+        assert cache.get_quote("AOT", fetch) == 1
+        assert cache.get_quote("BBL", fetch) == 2
+        clock.now = 1.0
+        assert cache.get_quote("AOT", fetch) == 3
+
+        assert cache.hits[QUOTE_SYMBOL] == 1
+        assert cache.misses[QUOTE_SYMBOL] == 3
+
+    def test_quote_not_cached_by_default(self):
+        cache = ResponseCache(ttl=None)
+        fetch = Mock(return_value=1)
+
+        cache.get_quote("AOT", fetch)
+        cache.get_quote("AOT", fetch)
+
+        assert fetch.call_count == 2
+
+    def test_token_refresh(self):
+        settrade_ctx = Mock()
+        cache = ResponseCache(ttl=None)
+        fetch = Mock(return_value=1)
+        watch_token_refresh(settrade_ctx, cache)
+
+        cache.get(ACCOUNT_INFO, fetch)
+        on_token_refresh(settrade_ctx)
+        cache.get(ACCOUNT_INFO, fetch)
+
+        assert fetch.call_count == 2
+
+
+@pytest.fixture
+def snapshot_ctx_list():
+    snapshot = AccountSnapshot()
+    ctx_list = [
+        ExecuteContextSymbol(
+            settrade_user=ANY, account_no=ANY, symbol=i, snapshot=snapshot
+        )
+        for i in ["AOT", "BBL"]
+    ]
+    for ctx in ctx_list:
+        ctx._get_account_info = Mock(return_value=Mock(line_available=100.0))
+        ctx._get_orders = Mock(return_value=())
+    return ctx_list
+
+
+def test_context_share_snapshot(snapshot_ctx_list):
+    for ctx in snapshot_ctx_list:
+        assert ctx.line_available == 100.0
+        assert ctx.get_orders() == []
+
+    assert sum(i._get_account_info.call_count for i in snapshot_ctx_list) == 1
+    assert sum(i._get_orders.call_count for i in snapshot_ctx_list) == 1
+
+
+def test_context_invalidate_snapshot(snapshot_ctx_list):
+    ctx_1, ctx_2 = snapshot_ctx_list
+
+    ctx_1.line_available
+    ctx_1._invalidate_cache()
+    ctx_2.line_available
+
+    ctx_1._get_account_info.assert_called_once()
+    ctx_2._get_account_info.assert_called_once()
+
+
+def test_prefetch(snapshot_ctx_list):
+    ctx = snapshot_ctx_list[0]
+    ctx._get_portfolios = Mock(return_value=Mock())
+    ctx._get_quote_symbol = Mock(return_value=Mock(last=1.0))
+
+    ctx.prefetch(keys=[ACCOUNT_INFO, PORTFOLIOS, ORDERS, QUOTE_SYMBOL], symbols=["AOT"])
+    ctx.line_available
+    ctx.get_portfolios()
+    ctx.get_orders()
+    ctx.market_price
+
+    ctx._get_account_info.assert_called_once()
+    ctx._get_portfolios.assert_called_once()
+    ctx._get_orders.assert_called_once()
+    ctx._get_quote_symbol.assert_called_once_with("AOT")
+    assert list(ctx._snapshot.quotes) == ["AOT"]
+
+
+def test_quote_live_without_prefetch(snapshot_ctx_list):
+    ctx = snapshot_ctx_list[0]
+    ctx._get_quote_symbol = Mock(side_effect=[Mock(last=1.0), Mock(last=2.0)])
+
+    assert ctx.market_price == 1.0
+    assert ctx.market_price == 2.0
+    assert ctx._snapshot.quotes == {}
@@ -1,10 +1,17 @@
+import gc
+import weakref
 from dataclasses import dataclass
 from typing import Callable
-from unittest.mock import ANY
+from unittest.mock import ANY, Mock
 
 import pytest
+from settrade_v2.errors import SettradeError
 
+from ezyquant_execution import utils
+from ezyquant_execution.cache import AccountSnapshot
 from ezyquant_execution.context import ExecuteContext, ExecuteContextSymbol
+from ezyquant_execution.entity import PortfolioResponse
+from ezyquant_execution.realtime import StaleDataError
 
 SYMBOL = "AOT"
 
@@ -49,3 +56,166 @@ class TestStruct:
 def test_filter_list(ctx: ExecuteContext, l: list, condition: Callable, expected: list):
     result = ctx._filter_list(l, condition=condition)
     assert result == expected
+
+
+@pytest.mark.parametrize(
+    ("l", "expected"),
+    [
+        (utils.SymbolTuple(), []),
+        (
+            utils.SymbolTuple(
+                [TestStruct(id=1, symbol=SYMBOL), TestStruct(id=2, symbol="BBL")]
+            ),
+            [TestStruct(id=1, symbol=SYMBOL)],
+        ),
+        (
+            utils.SymbolTuple(
+                [TestStruct(id=1, symbol=SYMBOL), TestStruct(id=2, symbol=SYMBOL)]
+            ),
+            [TestStruct(id=1, symbol=SYMBOL), TestStruct(id=2, symbol=SYMBOL)],
+        ),
+    ],
+)
+def test_filter_symbol_tuple(ctx: ExecuteContext, l: utils.SymbolTuple, expected: list):
+    result = ctx._filter_list(l)
+    assert result == expected
+
+
+def test_settrade_handles_once_per_context():
+    settrade_user = Mock()
+    ctx_1 = ExecuteContext(settrade_user=settrade_user, account_no="acc")
+    ctx_2 = ExecuteContext(settrade_user=settrade_user, account_no="acc")
+
+    assert ctx_1._settrade_equity is ctx_1._settrade_equity
+    assert ctx_1._settrade_market_data is ctx_1._settrade_market_data
+    ctx_2._settrade_equity
+
+    assert settrade_user.Equity.call_count == 2
+    assert settrade_user.MarketData.call_count == 1
+
+    # Handles don't keep user alive after its contexts are deleted
+    ref = weakref.ref(settrade_user)
+    del ctx_1, ctx_2, settrade_user
+    gc.collect()
+    assert ref() is None
+
+
+def test_target_pct_port_many():
+    # Mock
+    ctx = ExecuteContext(settrade_user=ANY, account_no=ANY, snapshot=AccountSnapshot())
+    ctx._get_account_info = Mock(return_value=Mock(line_available=400.0))
+    ctx._get_orders = Mock(return_value=())
+    ctx._get_portfolios = Mock(
+        return_value=PortfolioResponse(
+            portfolio_list=[
+                Mock(symbol="AOT", market_value=300.0),
+                Mock(symbol="BBL", market_value=300.0),
+            ],
+            total_portfolio=Mock(market_value=600.0),
+        )
+    )
+    calls = []
+    symbol_ctx = {}
+
+    def Symbol(symbol):
+        m = symbol_ctx.setdefault(symbol, Mock())
+        m.buy_value.side_effect = lambda v: calls.append(("buy", symbol, v)) or symbol
+        m.sell_value.side_effect = lambda v: calls.append(("sell", symbol, v))
+        return m
+
+    ctx.Symbol = Symbol
+
+    # Test
+    result = ctx.target_pct_port_many({"CPALL": 0.2, "AOT": 0.5, "BBL": 0.1})
+
+    # Check
+    assert calls == [
+        ("sell", "BBL", pytest.approx(200.0)),
+        ("buy", "CPALL", pytest.approx(200.0)),
+        ("buy", "AOT", pytest.approx(200.0)),
+    ]
+    assert result == ["CPALL", "AOT"]
+    ctx._get_account_info.assert_called_once()
+    ctx._get_portfolios.assert_called_once()
+
+
+def test_cancel_orders_chunk():
+    # Mock
+    ctx = ExecuteContext(settrade_user=ANY, account_no=ANY)
+    ctx._settrade_equity = Mock()
+
+    def cancel_orders(order_no_list, **kwargs):
+        if "3" in order_no_list:
+            raise SettradeError(code="E1", message="error", status_code=400)
+        return {
+            "results": [
+                {
+                    "orderNo": i,
+                    "errorResponse": None,
+                    "httpStatus": "OK",
+                    "httpStatusCode": 200,
+                }
+                for i in order_no_list
+            ]
+        }
+
+    ctx._settrade_equity.cancel_orders.side_effect = cancel_orders
+
+    # Test
+    result = ctx._cancel_orders(["1", "2", "3", "4", "5"], chunk_size=2)
+
+    # Check
+    assert ctx._settrade_equity.cancel_orders.call_count == 3
+    assert [i.order_no for i in result] == ["1", "2", "3", "4", "5"]
+    assert [i.http_status_code for i in result] == [200, 200, 400, 400, 200]
+    assert result[2].error_response == {"code": "E1", "message": "error"}
+
+
+def test_cancel_orders_chunk_raise():
+    # Mock
+    ctx = ExecuteContext(settrade_user=ANY, account_no=ANY)
+    ctx._settrade_equity = Mock()
+    ctx._settrade_equity.cancel_orders.side_effect = ValueError
+
+    # Test
+    with pytest.raises(ValueError):
+        ctx._cancel_orders(["1", "2", "3"], chunk_size=1)
+
+
+def test_cancel_all_orders():
+    # Mock
+    ctx = ExecuteContextSymbol(
+        settrade_user=ANY, account_no=ANY, symbol=SYMBOL, snapshot=AccountSnapshot()
+    )
+    ctx._get_orders = Mock(
+        return_value=utils.SymbolTuple(
+            [
+                Mock(symbol=SYMBOL, order_no="1", can_cancel=True),
+                Mock(symbol=SYMBOL, order_no="2", can_cancel=False),
+                Mock(symbol="BBL", order_no="3", can_cancel=True),
+            ]
+        )
+    )
+    ctx._cancel_orders = Mock()
+
+    # Test
+    ctx.cancel_all_orders()
+
+    # Check
+    ctx._cancel_orders.assert_called_once_with(["1"], None, max_workers=1)
+
+
+def test_buy_value_stale_price(ctx: ExecuteContextSymbol, monkeypatch):
+    # Mock
+    sub = Mock(get_data=Mock(side_effect=StaleDataError))
+    monkeypatch.setattr(ExecuteContextSymbol, "_bo_sub", property(lambda _: sub))
+    ctx.max_price_age = 5.0
+    ctx.place_order = Mock()
+
+    # Test
+    with pytest.raises(StaleDataError):
+        ctx.buy_value(1000.0)
+
+    # Check
+    sub.get_data.assert_called_once_with(5.0)
+    ctx.place_order.assert_not_called()
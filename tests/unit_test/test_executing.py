@@ -1,12 +1,29 @@
+import asyncio
 from datetime import datetime, time, timedelta
+from threading import Barrier, Event, Lock, Timer
+from time import sleep
+from types import SimpleNamespace
 from typing import Any, Callable, Dict, Optional
 from unittest.mock import ANY, Mock
 
 import pytest
 
+from ezyquant_execution import executing
+from ezyquant_execution.cache import ACCOUNT_INFO
 from ezyquant_execution.context import ExecuteContextSymbol
-from ezyquant_execution.executing import async_execute_on_timer, execute_on_timer
-from tests.utils import AsyncMock
+from ezyquant_execution.executing import (
+    _ContextPool,
+    _TickDispatcher,
+    async_execute_on_timer,
+    execute_on_symbol_timer,
+    execute_on_tick,
+    execute_on_timer,
+    execute_on_timer_accounts,
+    execute_on_timer_sharded,
+    warm_up_subscriptions,
+)
+from ezyquant_execution.realtime import BidOfferSubscriber, SubscriptionManager
+from tests.utils import AsyncMock, FakeRealtimeDataConnection
 
 
 class TestExecuteOnTimer:
@@ -105,3 +122,474 @@ async def test_async_execute_on_timer():
                 signal=v,
             )
         )
+
+
+def test_execute_on_timer_max_workers():
+    """on_timer of every symbol run in parallel and next iteration wait for
+    all of them."""
+    # Mock
+    signal_dict = {"a": 1, "b": 2, "c": 3}
+    event = Event()
+    barrier = Barrier(len(signal_dict), timeout=5)
+    calls = []
+
+    def on_timer(ctx: ExecuteContextSymbol):
+        barrier.wait()
+        calls.append(ctx.symbol)
+        if len(calls) == len(signal_dict):
+            event.set()
+
+    # Test
+    execute_on_timer(
+        settrade_user=ANY,
+        account_no=ANY,
+        signal_dict=signal_dict,
+        on_timer=on_timer,
+        interval=0.01,
+        start_time=time(0, 0, 0),
+        end_time=(datetime.now() + timedelta(seconds=10)).time(),
+        event=event,
+        max_workers=len(signal_dict),
+    )
+
+    # Check
+    assert sorted(calls) == ["a", "b", "c"]
+
+
+def test_execute_on_timer_max_workers_raise():
+    # Mock
+    on_timer = Mock(side_effect=BufferError)
+
+    # Test
+    with pytest.raises(BufferError):
+        execute_on_timer(
+            settrade_user=ANY,
+            account_no=ANY,
+            signal_dict={"a": 1, "b": 2},
+            on_timer=on_timer,
+            interval=0.01,
+            start_time=time(0, 0, 0),
+            end_time=(datetime.now() + timedelta(seconds=10)).time(),
+            max_workers=2,
+        )
+
+    # Check
+    assert on_timer.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_async_execute_on_timer_concurrent():
+    # Mock
+    signal_dict = {"a": 1, "b": 2}
+    event = asyncio.Event()
+    results = []
+
+    async def on_timer(ctx: ExecuteContextSymbol):
+        # deadlock if on_timer run one by one
+        if ctx.symbol == "a":
+            await b_started.wait()
+            raise BufferError
+        b_started.set()
+        return ctx.signal
+
+    def on_results(result: Dict[str, Any]):
+        results.append(result)
+        event.set()
+
+    b_started = asyncio.Event()
+
+    # Test
+    await asyncio.wait_for(
+        async_execute_on_timer(
+            settrade_user=ANY,
+            account_no=ANY,
+            signal_dict=signal_dict,
+            on_timer=on_timer,
+            interval=0.01,
+            start_time=time(0, 0, 0),
+            end_time=(datetime.now() + timedelta(seconds=10)).time(),
+            event=event,
+            is_concurrent=True,
+            on_results=on_results,
+        ),
+        timeout=5,
+    )
+
+    # Check
+    assert len(results) == 1
+    assert isinstance(results[0]["a"], BufferError)
+    assert results[0]["b"] == 2
+
+
+def test_execute_on_tick(monkeypatch: pytest.MonkeyPatch):
+    # Mock
+    rt_conn = FakeRealtimeDataConnection()
+    settrade_user = Mock()
+    settrade_user.RealtimeDataConnection.return_value = rt_conn
+    manager = SubscriptionManager(BidOfferSubscriber, "bo", max_size=1)
+    monkeypatch.setattr(executing, "bo_sub_manager", manager)
+    warm_up = Mock(return_value=[])
+    monkeypatch.setattr(executing, "warm_up_subscriptions", warm_up)
+    event = Event()
+    calls = []
+
+    def on_tick(ctx: ExecuteContextSymbol):
+        calls.append(ctx.symbol)
+        if len(calls) == 2:
+            # Symbols with callback are acquired, not evicted by max_size
+            assert manager.symbols == ["a", "b"]
+            assert manager.stats()["acquired"] == 2
+            # burst of updates is coalesced into one call per symbol
+            for _ in range(3):
+                rt_conn.send("a", {"i": 1})
+                rt_conn.send("b", {"i": 1})
+        elif len(calls) == 4:
+            event.set()
+
+    # Test
+    execute_on_tick(
+        settrade_user=settrade_user,
+        account_no=ANY,
+        signal_dict={"a": 1, "b": 2},
+        on_tick=on_tick,
+        start_time=time(0, 0, 0),
+        end_time=(datetime.now() + timedelta(seconds=10)).time(),
+        event=event,
+    )
+
+    # Check
+    assert sorted(calls) == ["a", "a", "b", "b"]
+    assert manager.stats()["acquired"] == 0
+    assert not rt_conn.is_disconnected
+    warm_up.assert_called_once_with(
+        settrade_user,
+        {"a": 1, "b": 2},
+        is_bid_offer=True,
+        is_price_info=False,
+        timeout=30.0,
+    )
+
+
+def test_tick_dispatcher_max_in_flight():
+    # Mock
+    event = Event()
+    running = []
+    max_running = 0
+    lock = Lock()
+
+    def on_tick(ctx):
+        nonlocal max_running
+        with lock:
+            running.append(ctx.symbol)
+            max_running = max(max_running, len(running))
+        sleep(0.01)
+        with lock:
+            running.remove(ctx.symbol)
+        if ctx.symbol == "e":
+            raise BufferError
+
+    dispatcher = _TickDispatcher(on_tick=on_tick, max_in_flight=2)
+    for i in "abcde":
+        dispatcher.add(SimpleNamespace(symbol=i))  # type: ignore
+
+    # Test
+    with pytest.raises(BufferError):
+        dispatcher.run(event)
+
+    # Check
+    assert max_running == 2
+
+
+def test_execute_on_timer_accounts():
+    # Mock
+    event = Event()
+    barrier = Barrier(2, timeout=5)
+    lock = Lock()
+    calls = []
+
+    def on_timer(ctx: ExecuteContextSymbol):
+        # accounts run in parallel
+        if ctx.symbol == "a":
+            barrier.wait()
+        with lock:
+            calls.append(ctx)
+            if len(calls) == 4:
+                event.set()
+
+    user1 = Mock()
+    user2 = Mock()
+
+    # Test
+    execute_on_timer_accounts(
+        accounts=[
+            (user1, "acc1", None, {"a": 1, "b": 2}),
+            (user2, "acc2", "pin", {"a": 3, "b": 4}),
+        ],
+        on_timer=on_timer,
+        interval=0.01,
+        start_time=time(0, 0, 0),
+        end_time=(datetime.now() + timedelta(seconds=10)).time(),
+        event=event,
+    )
+
+    # Check
+    assert sorted((i.account_no, i.symbol, i.signal) for i in calls) == [
+        ("acc1", "a", 1),
+        ("acc1", "b", 2),
+        ("acc2", "a", 3),
+        ("acc2", "b", 4),
+    ]
+    snapshot_dict = {i.account_no: i._snapshot for i in calls}
+    assert snapshot_dict["acc1"] is not snapshot_dict["acc2"]
+    assert all(i._snapshot is snapshot_dict[i.account_no] for i in calls)
+    # one realtime connection for every account
+    user2.RealtimeDataConnection.assert_not_called()
+    rt_conn = user1.RealtimeDataConnection.return_value
+    assert all(i._settrade_realtime_data_connection is rt_conn for i in calls)
+
+
+def _raise_on_timer(ctx: ExecuteContextSymbol):
+    if ctx.symbol == "b":
+        raise BufferError
+
+
+def _noop_on_timer(ctx: ExecuteContextSymbol):
+    pass
+
+
+def test_execute_on_timer_sharded_raise():
+    with pytest.raises(RuntimeError, match="BufferError"):
+        execute_on_timer_sharded(
+            settrade_user="user",  # type: ignore
+            account_no="acc",
+            signal_dict={"a": 1, "b": 2, "c": 3},
+            on_timer=_raise_on_timer,
+            interval=0.01,
+            start_time=time(0, 0, 0),
+            end_time=(datetime.now() + timedelta(seconds=60)).time(),
+            n_shards=2,
+        )
+
+
+def test_execute_on_timer_sharded_event_set():
+    # Mock
+    event = Event()
+    Timer(2, event.set).start()
+
+    # Test
+    execute_on_timer_sharded(
+        settrade_user="user",  # type: ignore
+        account_no="acc",
+        signal_dict={"a": 1, "b": 2},
+        on_timer=_noop_on_timer,
+        interval=0.01,
+        start_time=time(0, 0, 0),
+        end_time=(datetime.now() + timedelta(seconds=60)).time(),
+        event=event,
+        n_shards=2,
+    )
+
+    # Check
+    assert event.is_set()
+
+
+def test_execute_on_symbol_timer():
+    # Mock
+    event = Event()
+    lock = Lock()
+    calls = []
+
+    def on_timer(ctx: ExecuteContextSymbol):
+        with lock:
+            calls.append(ctx.symbol)
+            if calls.count("fast") == 5:
+                event.set()
+
+    # Test
+    execute_on_symbol_timer(
+        settrade_user=ANY,
+        account_no=ANY,
+        signal_dict={"fast": 0.01, "slow": 60.0},
+        on_timer=on_timer,
+        interval=lambda x: x,
+        start_time=time(0, 0, 0),
+        end_time=(datetime.now() + timedelta(seconds=10)).time(),
+        event=event,
+        max_workers=2,
+    )
+
+    # Check
+    assert calls.count("fast") == 5
+    assert calls.count("slow") == 1
+
+
+def test_execute_on_symbol_timer_snapshot():
+    # Mock
+    event = Event()
+    fast_done = Event()
+    snapshots: Dict[str, list] = {"fast": [], "slow": []}
+
+    def on_timer(ctx: ExecuteContextSymbol):
+        snapshots[ctx.symbol].append(ctx._snapshot)
+        if ctx.symbol == "slow":
+            snapshot = ctx._snapshot
+            snapshot.get(ACCOUNT_INFO, lambda: 1)
+            assert fast_done.wait(5)
+            # Batches of other symbols don't clear snapshot of running symbol
+            assert ctx._snapshot is snapshot
+            assert snapshot.get(ACCOUNT_INFO, Mock(return_value=2)) == 1
+            event.set()
+        elif len(snapshots["fast"]) == 3:
+            fast_done.set()
+
+    # Test
+    execute_on_symbol_timer(
+        settrade_user=ANY,
+        account_no=ANY,
+        signal_dict={"fast": 0.01, "slow": 60.0},
+        on_timer=on_timer,
+        interval=lambda x: x,
+        start_time=time(0, 0, 0),
+        end_time=(datetime.now() + timedelta(seconds=10)).time(),
+        event=event,
+        max_workers=2,
+    )
+
+    # Check
+    assert snapshots["slow"][0] is snapshots["fast"][0]
+    assert len({id(i) for i in snapshots["fast"][:3]}) == 3
+
+
+def test_execute_on_symbol_timer_raise():
+    # Mock
+    on_timer = Mock(side_effect=BufferError)
+
+    # Test
+    with pytest.raises(BufferError):
+        execute_on_symbol_timer(
+            settrade_user=ANY,
+            account_no=ANY,
+            signal_dict={"a": 1},
+            on_timer=on_timer,
+            interval={"a": 0.01},
+            start_time=time(0, 0, 0),
+            end_time=(datetime.now() + timedelta(seconds=10)).time(),
+        )
+
+    # Check
+    on_timer.assert_called_once()
+
+
+def test_context_pool():
+    rt_conn = FakeRealtimeDataConnection(ready=["a", "b", "c"])
+    manager = SubscriptionManager(BidOfferSubscriber, "bo")
+    make_ctx = Mock(
+        side_effect=lambda symbol, signal: SimpleNamespace(
+            symbol=symbol, signal=signal, sub=manager.get(symbol, rt_conn)
+        )
+    )
+    pool = _ContextPool(make_ctx, managers=[manager])
+
+    a, b = pool.update({"a": 1, "b": 2})
+    result = pool.update({"b": 3, "c": 4})
+
+    assert [(i.symbol, i.signal) for i in result] == [("b", 3), ("c", 4)]
+    assert result[0] is b
+    assert make_ctx.call_count == 3
+    assert manager.stats()["acquired"] == 2
+
+    # Replace every symbol, then exit
+    assert pool.update({"a": 5})[0] is not a
+    pool.clear()
+
+    # Released symbols keep the shared connection and their subscriptions
+    assert manager.stats()["acquired"] == 0
+    assert not rt_conn.is_disconnected
+    assert rt_conn.stopped == []
+    assert not a.sub.is_stopped
+
+
+def test_execute_on_timer_signal_function():
+    # Mock
+    event = Event()
+    signal_list = [{"a": 1}, {"a": 2, "b": 3}]
+    calls = []
+
+    def get_signal_dict():
+        if len(signal_list) == 1:
+            event.set()
+        return signal_list.pop(0)
+
+    # Test
+    execute_on_timer(
+        settrade_user=ANY,
+        account_no=ANY,
+        signal_dict=get_signal_dict,
+        on_timer=lambda ctx: calls.append((ctx.symbol, ctx.signal)),
+        interval=0.01,
+        start_time=time(0, 0, 0),
+        end_time=(datetime.now() + timedelta(seconds=10)).time(),
+        event=event,
+    )
+
+    # Check
+    assert calls == [("a", 1), ("a", 2), ("b", 3)]
+
+
+def test_warm_up_subscriptions(monkeypatch: pytest.MonkeyPatch):
+    # Mock
+    subscribe_many = Mock(return_value=["b"])
+    monkeypatch.setattr(executing, "subscribe_many", subscribe_many)
+    settrade_user = Mock()
+
+    # Test
+    result = warm_up_subscriptions(settrade_user, ["a", "b"], is_price_info=True)
+
+    # Check
+    assert result == ["b"]
+    subscribe_many.assert_called_once_with(
+        ["a", "b"],
+        settrade_user.RealtimeDataConnection.return_value,
+        is_bid_offer=True,
+        is_price_info=True,
+        timeout=30.0,
+    )
+
+
+def test_execute_on_timer_warm_up(monkeypatch: pytest.MonkeyPatch):
+    # Mock
+    calls = []
+    monkeypatch.setattr(
+        executing,
+        "warm_up_subscriptions",
+        lambda *args, **kwargs: calls.append(("warm_up", args, kwargs)) or [],
+    )
+    event = Event()
+
+    def on_timer(ctx):
+        calls.append(("on_timer", ctx.symbol))
+        event.set()
+
+    # Test
+    execute_on_timer(
+        settrade_user=ANY,
+        account_no=ANY,
+        signal_dict={"a": 1},
+        on_timer=on_timer,
+        interval=0.01,
+        start_time=time(0, 0, 0),
+        end_time=(datetime.now() + timedelta(seconds=10)).time(),
+        event=event,
+        warm_up=["bid_offer"],
+        warm_up_timeout=5.0,
+    )
+
+    # Check
+    assert calls == [
+        (
+            "warm_up",
+            (ANY, {"a": 1}),
+            {"is_bid_offer": True, "is_price_info": False, "timeout": 5.0},
+        ),
+        ("on_timer", "a"),
+    ]
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from ezyquant_execution.history import BidOfferHistory
+
+
+def bid_offer_data(best_bid: float, bid_volume: int = 100, ask_volume: int = 100):
+    data = {}
+    for i in range(1, 11):
+        data[f"bid_price{i}"] = best_bid - (i - 1) * 0.25
+        data[f"bid_volume{i}"] = bid_volume
+        data[f"ask_price{i}"] = best_bid + i * 0.25
+        data[f"ask_volume{i}"] = ask_volume
+    return data
+
+
+def test_invalid_capacity():
+    with pytest.raises(ValueError):
+        BidOfferHistory(0)
+    with pytest.raises(ValueError):
+        BidOfferHistory(3, slack=0)
+
+
+def test_empty():
+    history = BidOfferHistory(3)
+
+    result = history.last()
+
+    assert len(history) == 0
+    assert result.timestamp.shape == (0,)
+    assert result.bid_price.shape == (0, 10)
+
+
+@pytest.mark.parametrize("slack", [None, 1, 5])
+@pytest.mark.parametrize("n_update", [1, 3, 4, 6, 7, 100])
+def test_last(n_update: int, slack: int):
+    history = BidOfferHistory(3, slack=slack)
+
+    for i in range(n_update):
+        history.append(bid_offer_data(float(i)), timestamp=float(i))
+
+    expected = [float(i) for i in range(max(n_update - 3, 0), n_update)]
+    assert len(history) == len(expected)
+    assert history.count == n_update
+    assert history.last().timestamp.tolist() == expected
+    assert history.last(2).bid_price[:, 0].tolist() == expected[-2:]
+    assert history.last(100).ask_price[:, 0].tolist() == [i + 0.25 for i in expected]
+
+
+def test_last_is_view():
+    history = BidOfferHistory(3)
+    for i in range(5):
+        history.append(bid_offer_data(float(i)), timestamp=float(i))
+
+    result = history.last()
+
+    assert not result.timestamp.flags["OWNDATA"]
+    assert result.bid_price.flags["C_CONTIGUOUS"]
+
+
+@pytest.mark.parametrize("slack", [1, 3])
+def test_view_not_overwritten(slack: int):
+    history = BidOfferHistory(3, slack=slack)
+    for i in range(5):
+        history.append(bid_offer_data(float(i)), timestamp=float(i))
+
+    result = history.last()
+    for i in range(5, 5 + slack):
+        history.append(bid_offer_data(float(i)), timestamp=float(i))
+
+    # Window is valid for slack more updates
+    assert result.timestamp.tolist() == [2.0, 3.0, 4.0]
+    assert result.bid_price[:, 0].tolist() == [2.0, 3.0, 4.0]
+
+
+def test_since():
+    history = BidOfferHistory(5)
+    for i in range(8):
+        history.append(bid_offer_data(float(i)), timestamp=float(i))
+
+    assert history.since(2.0, now=7.0).timestamp.tolist() == [5.0, 6.0, 7.0]
+    assert history.since(100.0, now=7.0).timestamp.tolist() == [3.0, 4.0, 5.0, 6.0, 7.0]
+    assert history.since(1.0, now=100.0).timestamp.tolist() == []
+
+
+def test_analytics():
+    history = BidOfferHistory(5)
+    history.append(bid_offer_data(10.0, bid_volume=300, ask_volume=100), timestamp=1.0)
+
+    result = history.last()
+
+    np.testing.assert_allclose(result.spread, [0.25])
+    np.testing.assert_allclose(result.mid_price, [10.125])
+    np.testing.assert_allclose(result.microprice, [10.1875])
+    np.testing.assert_allclose(result.imbalance(), [0.5])
+    np.testing.assert_allclose(result.imbalance(10), [0.5])
+
+
+def test_clear():
+    history = BidOfferHistory(3)
+    history.append(bid_offer_data(1.0), timestamp=1.0)
+
+    history.clear()
+
+    assert len(history) == 0
+    assert history.last().timestamp.tolist() == []
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import pytest
+
+from ezyquant_execution import metrics
+from ezyquant_execution.metrics import LatencyRecorder
+
+
+def test_disabled():
+    recorder = LatencyRecorder()
+
+    recorder.record("a", 1.0)
+    with recorder.time("b"):
+        pass
+
+    assert recorder.summary() == {}
+
+
+def test_summary():
+    recorder = LatencyRecorder(enabled=True)
+
+    for i in range(1, 101):
+        recorder.record("get_orders", i / 1000, symbol="AOT" if i % 2 else "BBL")
+    recorder.record("iteration", 0.5)
+
+    result = recorder.summary()
+    assert list(result) == ["get_orders", "iteration"]
+    assert result["get_orders"]["count"] == 100
+    assert result["get_orders"]["p50"] == pytest.approx(0.0505)
+    assert result["get_orders"]["p99"] == pytest.approx(0.09901)
+    assert result["get_orders"]["max"] == pytest.approx(0.1)
+
+    result = recorder.summary(by_symbol=True)
+    assert list(result) == ["get_orders:AOT", "get_orders:BBL", "iteration"]
+    assert result["get_orders:AOT"]["count"] == 50
+
+    recorder.reset()
+    assert recorder.summary() == {}
+
+
+def test_history():
+    recorder = LatencyRecorder(history=2, enabled=True)
+
+    for i in range(5):
+        recorder.record("a", i)
+
+    assert recorder.summary()["a"]["mean"] == 3.5
+
+
+def test_timed(monkeypatch: pytest.MonkeyPatch):
+    recorder = LatencyRecorder(enabled=True)
+    monkeypatch.setattr(metrics, "recorder", recorder)
+
+    @metrics.timed("place_order")
+    def place_order(self):
+        return 1
+
+    assert place_order(SimpleNamespace(symbol="AOT")) == 1
+    assert place_order(SimpleNamespace()) == 1
+
+    result = recorder.summary(by_symbol=True)
+    assert result["place_order"]["count"] == 1
+    assert result["place_order:AOT"]["count"] == 1
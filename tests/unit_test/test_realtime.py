@@ -0,0 +1,423 @@
+import time
+from threading import Event, Timer
+
+import pytest
+
+from ezyquant_execution import realtime
+from ezyquant_execution.realtime import (
+    SettradeSubscriber,
+    SubscriptionManager,
+    subscribe_many,
+)
+from tests.utils import FakeRealtimeDataConnection
+
+
+@pytest.fixture(autouse=True)
+def sub_manager(monkeypatch):
+    monkeypatch.setattr(
+        realtime,
+        "bo_sub_manager",
+        SubscriptionManager(realtime.BidOfferSubscriber, "subscribe_bid_offer"),
+    )
+    monkeypatch.setattr(
+        realtime,
+        "pi_sub_manager",
+        SubscriptionManager(realtime.PriceInfoSubscriber, "subscribe_price_info"),
+    )
+
+
+class FakeExpiry(realtime._Expiry):
+    def __init__(self):
+        """Expiry with manual clock and no thread."""
+        self.now = 0.0
+        super().__init__(clock=lambda: self.now, is_thread=False)
+
+    def advance(self, seconds: float) -> int:
+        """Move clock forward and expire due subscribers."""
+        self.now += seconds
+        return self.expire_due()
+
+
+@pytest.fixture
+def expiry(monkeypatch):
+    expiry = FakeExpiry()
+    monkeypatch.setattr(realtime, "_expiry", expiry)
+    return expiry
+
+
+def test_subscriber_no_wait():
+    rt_conn = FakeRealtimeDataConnection(ready=[])
+
+    sub = SettradeSubscriber(
+        rt_conn.subscribe_bid_offer, symbol="AOT", is_wait=False, timeout=1
+    )
+    assert not sub.wait(0)
+
+    Timer(0.05, rt_conn.send, args=("AOT", {"symbol": "AOT"})).start()
+    assert sub.data == {"symbol": "AOT"}
+
+
+def test_subscriber_timeout(expiry):
+    rt_conn = FakeRealtimeDataConnection(ready=[])
+
+    with pytest.raises(ConnectionError):
+        SettradeSubscriber(rt_conn.subscribe_bid_offer, symbol="AOT", timeout=0.05)
+
+    # Subscription is stopped and not kept for expiry
+    assert rt_conn.stopped == ["AOT"]
+    assert len(expiry) == 0
+
+
+def test_subscribe_many():
+    rt_conn = FakeRealtimeDataConnection(ready=["AOT", "BBL"])
+
+    result = subscribe_many(
+        ["AOT", "BBL", "AOT", "PTT"],
+        rt_conn,  # type: ignore
+        is_price_info=True,
+        timeout=0.1,
+    )
+
+    assert result == ["PTT"]
+    assert realtime.bo_sub_manager.symbols == ["AOT", "BBL", "PTT"]
+    assert realtime.pi_sub_manager.symbols == ["AOT", "BBL", "PTT"]
+
+    # Cache return the same subscriber
+    sub = realtime.BidOfferSubscriberCache("AOT", rt_conn)  # type: ignore
+    assert sub is realtime.bo_sub_manager.get("AOT", rt_conn)  # type: ignore
+
+
+def bid_offer_data(symbol: str, best_bid: float) -> dict:
+    data = {"symbol": symbol}
+    for i in range(1, 11):
+        data[f"bid_price{i}"] = best_bid - (i - 1) * 0.25
+        data[f"bid_volume{i}"] = i * 100
+        data[f"ask_price{i}"] = best_bid + i * 0.25
+        data[f"ask_volume{i}"] = i * 100
+    return data
+
+
+def test_bid_offer_parse_once():
+    rt_conn = FakeRealtimeDataConnection(ready=[])
+    sub = realtime.BidOfferSubscriber("AOT", rt_conn, is_wait=False)  # type: ignore
+
+    rt_conn.send("AOT", bid_offer_data("AOT", 60.0))
+    result = sub.data
+
+    assert result is sub.data
+    assert result.best_bid_price == 60.0
+    assert result.best_ask_price == 60.25
+    assert result.bids[9].volume == 1000
+
+    rt_conn.send("AOT", bid_offer_data("AOT", 61.0))
+
+    assert sub.data is not result
+    assert sub.data.best_bid_price == 61.0
+
+
+def test_bid_offer_history():
+    rt_conn = FakeRealtimeDataConnection(ready=[])
+    sub = realtime.BidOfferSubscriber(
+        "AOT", rt_conn, is_wait=False, history=2  # type: ignore
+    )
+
+    for i in [60.0, 61.0, 62.0]:
+        rt_conn.send("AOT", bid_offer_data("AOT", i))
+
+    assert sub.history is not None
+    assert sub.history.last().bid_price[:, 0].tolist() == [61.0, 62.0]
+
+
+def test_bid_offer_history_disabled():
+    rt_conn = FakeRealtimeDataConnection(ready=[])
+    sub = realtime.BidOfferSubscriber("AOT", rt_conn, is_wait=False)  # type: ignore
+
+    assert sub.history is None
+
+
+def test_listener():
+    rt_conn = FakeRealtimeDataConnection(ready=[])
+    sub = realtime.BidOfferSubscriber("AOT", rt_conn, is_wait=False)  # type: ignore
+    result = []
+    done = Event()
+
+    def function(data):
+        result.append(data)
+        done.set()
+
+    listener = sub.add_listener(function)
+    rt_conn.send("AOT", bid_offer_data("AOT", 60.0))
+
+    assert done.wait(1)
+    assert result[0].best_bid_price == 60.0
+    assert result[0] is sub.data
+    assert listener.received == 1
+    assert listener.processed == 1
+
+    sub.remove_listener(listener)
+    listener.join(1)
+    rt_conn.send("AOT", bid_offer_data("AOT", 61.0))
+
+    assert listener.received == 1
+
+
+def test_listener_drop_oldest():
+    rt_conn = FakeRealtimeDataConnection(ready=[])
+    sub = SettradeSubscriber(rt_conn.subscribe_bid_offer, symbol="AOT", is_wait=False)
+    block = Event()
+    result = []
+
+    def function(data):
+        block.wait(1)
+        result.append(data["i"])
+
+    listener = sub.add_listener(function, maxsize=2)
+    rt_conn.send("AOT", {"i": 0})
+    # wait until the first message is processing
+    while listener.pending:
+        time.sleep(0.001)
+    for i in range(1, 5):
+        rt_conn.send("AOT", {"i": i})
+    block.set()
+    while listener.processed < 3:
+        time.sleep(0.001)
+
+    assert result == [0, 3, 4]
+    assert listener.received == 5
+    assert listener.dropped == 2
+    assert listener.max_lag > 0
+
+
+def test_listener_error():
+    rt_conn = FakeRealtimeDataConnection(ready=[])
+    sub = SettradeSubscriber(rt_conn.subscribe_bid_offer, symbol="AOT", is_wait=False)
+
+    listener = sub.add_listener(lambda x: 1 / 0)
+    rt_conn.send("AOT", {})
+    while listener.processed < 1:
+        time.sleep(0.001)
+
+    assert listener.errors == 1
+
+
+def test_seq_and_max_age():
+    rt_conn = FakeRealtimeDataConnection(ready=[])
+    sub = SettradeSubscriber(rt_conn.subscribe_bid_offer, symbol="AOT", is_wait=False)
+
+    assert sub.seq == 0
+    assert sub.age == float("inf")
+
+    rt_conn.send("AOT", {"i": 1})
+    rt_conn.send("AOT", {"i": 2})
+
+    assert sub.seq == 2
+    assert sub.received_at == pytest.approx(time.time(), abs=1)
+    assert sub.get_data(max_age=60) == {"i": 2}
+
+    sub.received_monotonic -= 10  # type: ignore
+    with pytest.raises(realtime.StaleDataError):
+        sub.get_data(max_age=5)
+    assert sub.data == {"i": 2}
+
+
+def test_subscriber_stop():
+    rt_conn = FakeRealtimeDataConnection(ready=["AOT"])
+    sub = SettradeSubscriber(rt_conn.subscribe_bid_offer, symbol="AOT")
+    listener = sub.add_listener(lambda x: None)
+
+    sub.stop()
+    sub.stop()
+
+    assert sub.is_stopped
+    assert rt_conn.stopped == ["AOT"]
+    listener.join(1)
+    with pytest.raises(ConnectionError):
+        sub.data
+
+
+def test_subscriber_lifetime(expiry):
+    rt_conn = FakeRealtimeDataConnection(ready=["AOT", "BBL"])
+
+    sub1 = SettradeSubscriber(rt_conn.subscribe_bid_offer, symbol="AOT", lifetime=20)
+    sub2 = SettradeSubscriber(rt_conn.subscribe_bid_offer, symbol="BBL", lifetime=10)
+
+    assert expiry.advance(15) == 1
+    assert sub2.is_stopped
+    assert not sub1.is_stopped
+
+    assert expiry.advance(10) == 1
+    assert sub1.is_stopped
+    assert rt_conn.stopped == ["BBL", "AOT"]
+
+
+def test_subscriber_stop_remove_expiry(expiry):
+    rt_conn = FakeRealtimeDataConnection(ready=["AOT"])
+    sub = SettradeSubscriber(rt_conn.subscribe_bid_offer, symbol="AOT", lifetime=10)
+
+    sub.stop()
+
+    assert len(expiry) == 0
+    assert expiry.advance(20) == 0
+
+
+def test_subscriber_stop_keep_connection():
+    rt_conn = FakeRealtimeDataConnection(ready=["AOT", "BBL"])
+    aot = SettradeSubscriber(rt_conn.subscribe_bid_offer, symbol="AOT")
+
+    # Stop the last topic of the connection
+    aot.stop()
+    bbl = SettradeSubscriber(rt_conn.subscribe_bid_offer, symbol="BBL")
+    rt_conn.send("BBL", {"i": 1})
+
+    assert not rt_conn.is_disconnected
+    assert bbl.data == {"i": 1}
+
+
+def test_subscriber_renew(expiry):
+    rt_conn = FakeRealtimeDataConnection(ready=["AOT"])
+    calls = []
+    sub = SettradeSubscriber(
+        rt_conn.subscribe_bid_offer, symbol="AOT", lifetime=10, is_renew=True
+    )
+    sub.register_callback(lambda: calls.append(sub.data))
+    listener = sub.add_listener(lambda x: None)
+
+    assert expiry.advance(15) == 1
+    assert expiry.advance(15) == 1
+
+    assert not sub.is_stopped
+    assert len(expiry) == 1
+    # Topic is never unsubscribed and old subscriptions are removed
+    assert rt_conn.stopped == []
+    assert len(rt_conn.call_backer.callback_pool["on_message"]) == 1
+
+    rt_conn.send("AOT", {"i": 1})
+    while listener.processed < 1:
+        time.sleep(0.001)
+
+    assert calls[-1] == {"i": 1}
+    sub.stop()
+
+
+def test_manager_renew(expiry):
+    rt_conn = FakeRealtimeDataConnection(ready=["AOT"])
+
+    def subscriber(symbol, rt_conn, is_wait, is_renew):
+        return SettradeSubscriber(
+            rt_conn.subscribe_bid_offer,
+            symbol=symbol,
+            is_wait=is_wait,
+            is_renew=is_renew,
+            lifetime=10,
+        )
+
+    manager = SubscriptionManager(subscriber, "bo")
+    sub = manager.get("AOT", rt_conn)  # type: ignore
+    calls = []
+    sub.register_callback(lambda: calls.append(sub.data))
+    expiry.advance(15)
+    rt_conn.send("AOT", {"i": 1})
+
+    # Callback survive expiry on the same subscriber
+    assert manager.get("AOT", rt_conn) is sub  # type: ignore
+    assert calls[-1] == {"i": 1}
+    manager.clear()
+
+
+def test_manager_max_size():
+    rt_conn = FakeRealtimeDataConnection(ready=["AOT", "BBL", "PTT", "KBANK"])
+    manager = SubscriptionManager(realtime.BidOfferSubscriber, "bo", max_size=2)
+
+    aot = manager.get("AOT", rt_conn)  # type: ignore
+    manager.acquire("AOT")
+    manager.get("BBL", rt_conn)  # type: ignore
+    manager.get("PTT", rt_conn)  # type: ignore
+
+    # AOT is acquired, BBL is least recently used
+    assert manager.symbols == ["AOT", "PTT"]
+    assert rt_conn.stopped == ["BBL"]
+
+    manager.release("AOT")
+    manager.get("PTT", rt_conn)  # type: ignore
+    manager.get("KBANK", rt_conn)  # type: ignore
+
+    assert manager.symbols == ["PTT", "KBANK"]
+    assert aot.is_stopped
+
+
+def test_manager_acquire_subscribe():
+    rt_conn = FakeRealtimeDataConnection(ready=["AOT", "BBL"])
+    manager = SubscriptionManager(realtime.BidOfferSubscriber, "bo", max_size=1)
+
+    aot = manager.acquire("AOT", rt_conn)  # type: ignore
+    bbl = manager.acquire("BBL", rt_conn)  # type: ignore
+
+    assert aot is manager.get("AOT", rt_conn)  # type: ignore
+    assert bbl is manager.get("BBL", rt_conn)  # type: ignore
+    assert manager.symbols == ["AOT", "BBL"]
+    assert manager.stats()["acquired"] == 2
+
+
+def test_manager_unsubscribe():
+    rt_conn = FakeRealtimeDataConnection(ready=["AOT", "BBL"])
+    manager = SubscriptionManager(realtime.BidOfferSubscriber, "bo")
+    aot = manager.get("AOT", rt_conn)  # type: ignore
+    manager.get("BBL", rt_conn)  # type: ignore
+
+    assert manager.unsubscribe("AOT")
+    assert not manager.unsubscribe("AOT")
+    assert "AOT" not in manager
+    assert manager.stats()["subscriptions"] == 1
+
+    # Subscribe again
+    assert manager.get("AOT", rt_conn) is not aot  # type: ignore
+
+    manager.clear()
+    assert len(manager) == 0
+    assert rt_conn.stopped == ["AOT", "BBL", "AOT"]
+
+
+def test_manager_resubscribe_stopped():
+    rt_conn = FakeRealtimeDataConnection(ready=["AOT"])
+    manager = SubscriptionManager(realtime.BidOfferSubscriber, "bo")
+    sub = manager.get("AOT", rt_conn)  # type: ignore
+
+    sub.stop()
+
+    assert manager.get("AOT", rt_conn) is not sub  # type: ignore
+    assert manager.stats()["subscriptions"] == 1
+
+
+def test_subscription_stats():
+    rt_conn = FakeRealtimeDataConnection(ready=["AOT"])
+    sub = realtime.BidOfferSubscriberCache("AOT", rt_conn)  # type: ignore
+    sub.add_listener(lambda x: None)
+
+    result = realtime.subscription_stats()
+
+    assert result["bid_offer"] == {
+        "subscriptions": 1,
+        "acquired": 0,
+        "listeners": 1,
+        "history_bytes": 0,
+    }
+    assert result["price_info"]["subscriptions"] == 0
+    assert result["threads"] > 1
+
+
+def test_register_callback():
+    rt_conn = FakeRealtimeDataConnection(ready=[])
+    sub = SettradeSubscriber(rt_conn.subscribe_bid_offer, symbol="AOT", is_wait=False)
+    calls = []
+
+    def callback():
+        calls.append(sub.data)
+
+    sub.register_callback(callback)
+    rt_conn.send("AOT", {"i": 1})
+
+    assert sub.unregister_callback(callback)
+    assert not sub.unregister_callback(callback)
+    rt_conn.send("AOT", {"i": 2})
+
+    assert calls[-1] == {"i": 1}
@@ -0,0 +1,172 @@
+from datetime import date, datetime, time
+from unittest.mock import Mock
+
+import pytest
+
+from ezyquant_execution.scheduler import (
+    FixedRateScheduler,
+    IntervalScheduler,
+    Scheduler,
+    SessionScheduler,
+    SymbolScheduler,
+    calendar_session,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _scheduler(overrun: str = "skip", wall: float = 0.0) -> FixedRateScheduler:
+    clock = FakeClock(100.0)
+    scheduler = FixedRateScheduler(
+        10.0, overrun=overrun, clock=clock, wall_clock=FakeClock(wall)  # type: ignore
+    )
+    scheduler.start()
+    return scheduler
+
+
+def test_scheduler_abstract():
+    class NoTickScheduler(Scheduler):
+        def next_timeout(self) -> float:
+            return 1.0
+
+    with pytest.raises(TypeError):
+        Scheduler()  # type: ignore
+    with pytest.raises(TypeError):
+        NoTickScheduler()  # type: ignore
+
+
+def test_interval_scheduler():
+    scheduler = IntervalScheduler(1.5)
+    scheduler.start()
+
+    assert scheduler.next_timeout() == 1.5
+    assert scheduler.tick()
+
+
+@pytest.mark.parametrize("wall,expected", [(0.0, 10.0), (3.0, 7.0), (29.5, 0.5)])
+def test_align(wall: float, expected: float):
+    scheduler = _scheduler(wall=wall)
+
+    assert scheduler.next_timeout() == pytest.approx(expected)
+
+
+def test_no_drift():
+    scheduler = _scheduler()
+    clock = scheduler.clock
+
+    for i in range(1, 4):
+        assert not scheduler.tick()
+        clock.now = 100.0 + 10.0 * i + 0.5  # type: ignore
+        assert scheduler.tick()
+        # iteration take 3 seconds
+        clock.now += 3.0  # type: ignore
+        assert scheduler.next_timeout() == pytest.approx(6.5)
+
+    assert list(scheduler.lateness) == pytest.approx([0.5, 0.5, 0.5])
+    assert scheduler.tick_count == 3
+
+
+@pytest.mark.parametrize(
+    "overrun,expected_ticks,expected_missed",
+    [
+        ("skip", [False, False], 1),
+        ("catch_up", [True, True, False], 0),
+        ("coalesce", [True, False], 1),
+    ],
+)
+def test_overrun(overrun: str, expected_ticks: list, expected_missed: int):
+    scheduler = _scheduler(overrun)
+    # first tick at 110 is late 15 seconds
+    scheduler.clock.now = 125.0  # type: ignore
+
+    assert [scheduler.tick() for _ in expected_ticks] == expected_ticks
+    assert scheduler.next_timeout() == pytest.approx(5.0)
+    assert scheduler.missed_count == expected_missed
+
+
+@pytest.mark.parametrize(
+    "now,expected",
+    [
+        (time(8, 0), "Close"),
+        (time(9, 45), "Pre-Open1"),
+        (time(10, 0), "Open1"),
+        (time(13, 0), "Intermission1"),
+        (time(15, 0), "Open2"),
+        (time(16, 35), "Pre-Close"),
+        (time(18, 0), "Close"),
+    ],
+)
+def test_calendar_session(now: time, expected: str):
+    assert calendar_session(datetime.combine(date(2023, 1, 4), now)) == expected
+
+
+def test_session_scheduler():
+    now = datetime(2023, 1, 4, 12, 29, 0)
+    scheduler = SessionScheduler({"Open1": 1.0, "Open2": 2.0}, now=lambda: now)
+
+    assert scheduler.tick()
+    assert scheduler.next_timeout() == 1.0
+
+    # pause until pre-open 2
+    now = datetime(2023, 1, 4, 12, 30, 0)
+    assert not scheduler.tick()
+    assert scheduler.next_timeout() == 90 * 60
+
+    # pause until pre-open 1 of tomorrow
+    now = datetime(2023, 1, 4, 17, 0, 0)
+    assert scheduler.next_timeout() == 16.5 * 60 * 60
+
+
+@pytest.mark.parametrize(
+    "status,expected_tick",
+    [("OPEN1_E", True), ("Open2", True), ("CIRCUIT_BREAKER_E", False)],
+)
+def test_session_scheduler_market_status(status: str, expected_tick: bool):
+    scheduler = SessionScheduler(
+        {"Open1": 1.0, "Open2": 2.0},
+        market_status=lambda: status,
+        now=lambda: datetime(2023, 1, 4, 10, 0, 0),
+    )
+
+    assert scheduler.tick() == expected_tick
+    assert scheduler.next_timeout() == (2.0 if status == "Open2" else 1.0)
+
+
+def test_session_scheduler_market_status_error():
+    scheduler = SessionScheduler(
+        {"Open1": 1.0},
+        market_status=Mock(side_effect=ConnectionError),
+        now=lambda: datetime(2023, 1, 4, 10, 0, 0),
+    )
+
+    assert scheduler.tick()
+    assert scheduler.session == "Open1"
+
+
+def test_symbol_scheduler():
+    clock = FakeClock(100.0)
+    scheduler = SymbolScheduler(
+        {"a": 1.0, "b": 5.0, "c": 1.0}, priorities={"c": -1}, clock=clock
+    )
+
+    # every symbol is due at start, lower priority first
+    assert scheduler.pop_due(2) == ["c", "a"]
+    assert scheduler.pop_due() == ["b"]
+    assert scheduler.next_timeout() is None
+
+    clock.now = 100.5
+    scheduler.push("a")
+    scheduler.push("b")
+    assert scheduler.next_timeout() == pytest.approx(0.5)
+    assert scheduler.pop_due() == []
+
+    # c is late, run now
+    clock.now = 102.0
+    scheduler.push("c")
+    assert scheduler.pop_due() == ["c", "a"]
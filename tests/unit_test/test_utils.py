@@ -1,3 +1,7 @@
+import asyncio
+from functools import partial
+from unittest.mock import Mock
+
 import pytest
 
 from ezyquant_execution import utils
@@ -169,3 +173,88 @@ def test_round_100(value, is_round_up, expected_output):
 )
 def test_match_tick_price(price, n_tick, is_round_up, expected_output):
     assert utils.match_tick_price(price, n_tick, is_round_up) == expected_output
+
+
+def test_index_by_symbol():
+    items = [Mock(symbol="AOT", id=1), Mock(symbol="BBL"), Mock(symbol="AOT", id=2)]
+
+    result = utils.index_by_symbol(items)
+
+    assert list(result) == ["AOT", "BBL"]
+    assert result["AOT"].id == 1
+
+
+def test_symbol_tuple():
+    items = [Mock(symbol="AOT"), Mock(symbol="BBL"), Mock(symbol="AOT")]
+
+    result = utils.SymbolTuple(items)
+
+    assert result == tuple(items)
+    assert result.by_symbol == {"AOT": (items[0], items[2]), "BBL": (items[1],)}
+
+
+def test_run_parallel():
+    result = utils.run_parallel([lambda: 1, lambda: 2, lambda: 3])
+
+    assert result == [1, 2, 3]
+
+
+def test_run_parallel_raise():
+    m = Mock()
+
+    with pytest.raises(BufferError):
+        utils.run_parallel([Mock(side_effect=BufferError), m])
+
+    m.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_async_run_parallel():
+    result = await utils.async_run_parallel([lambda: 1, lambda: 2])
+
+    assert result == [1, 2]
+
+
+@pytest.mark.parametrize(
+    "l,size,expected",
+    [
+        ([], 2, []),
+        ([1, 2, 3], 2, [[1, 2], [3]]),
+        ([1, 2, 3], 3, [[1, 2, 3]]),
+        ([1, 2, 3], 5, [[1, 2, 3]]),
+    ],
+)
+def test_chunked(l: list, size: int, expected: list):
+    assert utils.chunked(l, size) == expected
+
+
+@pytest.mark.asyncio
+async def test_async_gather_dict():
+    running = 0
+    max_running = 0
+
+    async def f(x):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01 * x)
+        running -= 1
+        if x == 0:
+            raise BufferError
+        return x
+
+    result = await utils.async_gather_dict(
+        {str(i): partial(f, i) for i in range(4)}, max_concurrency=2, timeout=0.025
+    )
+
+    assert isinstance(result.pop("0"), BufferError)
+    assert isinstance(result.pop("3"), asyncio.TimeoutError)
+    assert result == {"1": 1, "2": 2}
+    assert max_running == 2
+
+
+def test_split_dict():
+    d = {"a": 1, "b": 2, "c": 3}
+
+    assert utils.split_dict(d, 2) == [{"a": 1, "c": 3}, {"b": 2}]
+    assert utils.split_dict(d, 4) == [{"a": 1}, {"b": 2}, {"c": 3}, {}]
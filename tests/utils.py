@@ -1,6 +1,66 @@
+from typing import Callable, Iterable, List
 from unittest.mock import Mock
 
+from settrade_v2.realtime import CALLBACK_TYPE_LIST, CallBacker, Subscriber
+
 
 class AsyncMock(Mock):
     async def __call__(self, *args, **kwargs):
         return super(AsyncMock, self).__call__(*args, **kwargs)
+
+
+class FakeCallBacker(CallBacker):
+    def __init__(self):
+        """CallBacker of Settrade SDK with mock MQTT client, no connection."""
+        self.callback_pool = dict()
+        self.subscribed_topics = set()
+        self.client = Mock()
+        for i in CALLBACK_TYPE_LIST:
+            self._create_callback_pool(i)
+        self._add_base_topic(["$sys/u/_broker/_uref/error/subscribe"])
+
+
+class FakeRealtimeDataConnection:
+    def __init__(self, ready: Iterable[str] = ()):
+        """RealtimeDataConnection that create SDK subscribers on
+        FakeCallBacker. Send data of ready symbols immediately after start."""
+        self.ready = list(ready)
+        self.call_backer = FakeCallBacker()
+
+    @property
+    def stopped(self) -> List[str]:
+        """Symbols of unsubscribed topics in order."""
+        return [
+            i.args[0].rsplit("/", 1)[-1]
+            for i in self.call_backer.client.unsubscribe.call_args_list
+        ]
+
+    @property
+    def is_disconnected(self) -> bool:
+        return self.call_backer.client.disconnect.called
+
+    def subscribe_bid_offer(self, symbol: str, on_message: Callable) -> Subscriber:
+        return self._subscribe(f"proto/topic/bidofferv3/{symbol}", on_message)
+
+    def subscribe_price_info(self, symbol: str, on_message: Callable) -> Subscriber:
+        return self._subscribe(f"proto/topic/infov3/{symbol}", on_message)
+
+    def send(self, symbol: str, data: dict):
+        """Send data to every topic of symbol."""
+        for i in list(self.call_backer.callback_pool["on_message"]):
+            if i.topic.rsplit("/", 1)[-1] == symbol:
+                i.callback(None, None, {"is_success": True, "data": data})
+
+    def _subscribe(self, topic: str, on_message: Callable) -> Subscriber:
+        rt_conn = self
+
+        class _Subscriber(Subscriber):
+            def start(self):
+                super().start()
+                symbol = topic.rsplit("/", 1)[-1]
+                if symbol in rt_conn.ready:
+                    on_message({"is_success": True, "data": {"symbol": symbol}})
+
+        s = _Subscriber(self.call_backer, topic)
+        s.add_callback("on_message", lambda client, user_data, msg: on_message(msg))
+        return s